@@ -6,27 +6,52 @@ Admin functionality for the Anonymous Telegram Chat Bot
 """
 
 import os
+import re
 import logging
 import asyncio
 import platform
 import time
+import itertools
+from functools import wraps
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Set, Union, Any
+from typing import Dict, Optional, Set, Union, Any, Iterable, Iterator
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, LinkPreviewOptions
 from telegram.ext import ContextTypes
+from telegram.constants import ParseMode
 
+import config
 from config import (
-    ADMIN_IDS, ADMIN_PRIVILEGES, BOT_VERSION, BOT_STARTED_AT, 
-    BANNED_USERS, SYSTEM_CONFIG, STATISTICS, ADMIN_LOGS
+    ADMIN_IDS, ADMIN_PRIVILEGES, BOT_VERSION, BOT_STARTED_AT_MONO,
+    BANNED_USERS_MUTABLE, SYSTEM_CONFIG, STATISTICS, ADMIN_LOGS
 )
 from utils import (
-    ALL_USERS, ACTIVE_CONNECTIONS, WAITING_USERS, WAITING_BY_TOPIC,
-    GROUP_CHATS, USER_PREFERENCES, ChatMode
+    ALL_USERS, ACTIVE_CONNECTIONS, ACTIVE_PAIRS, WAITING_TICKETS, WAITING_SINCE,
+    GROUP_CHATS, USER_GROUPS, USER_PREFERENCES, UserPref, WAITING_TOPIC_OF, USERNAME_INDEX, ACTIVE_TODAY,
+    remove_topic_waiting, remove_waiting, unpair_user, disconnect_users, leave_group, bump_group_state,
+    reset_group_preference
 )
 
 logger = logging.getLogger(__name__)
 
+# Host details never change while the process runs, so look them up once
+_PLATFORM = platform.platform()
+_PYVER = platform.python_version()
+
+# Cached dashboard snapshot: the counts change slowly, so rescanning every
+# user/group/waiting list on each dashboard click is wasted work
+_STATUS_CACHE = {"ts": 0.0, "data": None}
+_STATS_CACHE = {"ts": 0.0}
+
+def _status_cache_ttl() -> float:
+    """Get the configured lifetime of the cached dashboard snapshot"""
+    return SYSTEM_CONFIG.get("status_cache_ttl", 30)
+
+def invalidate_status_cache() -> None:
+    """Force the next dashboard view to rebuild its status snapshot"""
+    _STATUS_CACHE["ts"] = 0.0
+    _STATS_CACHE["ts"] = 0.0
+
 # Admin utility functions
 def is_admin(user_id: int) -> bool:
     """Check if a user is an admin"""
@@ -38,54 +63,97 @@ def has_privilege(user_id: int, privilege: str) -> bool:
         return False
     return ADMIN_PRIVILEGES.get(privilege, False)
 
+def require_admin(privilege: Optional[str] = None, denied_text: str = "⚠️ You don't have permission to access admin features."):
+    """Decorator that only runs a handler for admins holding the given privilege"""
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+            user_id = update.effective_user.id
+            if user_id not in ADMIN_IDS or (privilege and not ADMIN_PRIVILEGES.get(privilege, False)):
+                if update.callback_query:
+                    await update.callback_query.edit_message_text(text=denied_text)
+                else:
+                    await context.bot.send_message(
+                        chat_id=update.effective_chat.id,
+                        text=denied_text
+                    )
+                return
+            return await func(update, context, *args, **kwargs)
+        return wrapper
+    return decorator
+
+# Admin actions waiting to be written to the logger by run_admin_log_writer()
+_ADMIN_LOG_Q = asyncio.Queue()
+
 def log_admin_action(admin_id: int, action: str, details: str = "") -> None:
     """Log an admin action to the audit log"""
+    # Timestamps are stored as epoch seconds and only turned into datetimes when displayed
     ADMIN_LOGS.append({
         "admin_id": admin_id,
         "action": action,
         "details": details,
-        "timestamp": datetime.now()
+        "timestamp": time.time()
     })
-    logger.info(f"Admin {admin_id} performed action: {action} - {details}")
+    _ADMIN_LOG_Q.put_nowait((admin_id, action, details))
+
+async def run_admin_log_writer() -> None:
+    """Background task that writes queued admin actions to the logger"""
+    while True:
+        admin_id, action, details = await _ADMIN_LOG_Q.get()
+        logger.info(f"Admin {admin_id} performed action: {action} - {details}")
+        _ADMIN_LOG_Q.task_done()
 
 async def update_statistics() -> None:
     """Update usage statistics for the admin dashboard"""
-    # Update active users today
-    today = datetime.now().date()
-    active_today = set()
-    
-    for user_id, user in ALL_USERS.items():
-        # In a real implementation, you'd track when users were last active
-        # Here we're just using all users as a placeholder
-        active_today.add(user_id)
+    now = time.monotonic()
+    if now - _STATS_CACHE["ts"] < _status_cache_ttl():
+        return
+    _STATS_CACHE["ts"] = now
     
-    STATISTICS["active_users_today"] = len(active_today)
+    # Users active today are tracked as they send messages
+    STATISTICS["active_users_today"] = len(ACTIVE_TODAY)
     STATISTICS["unique_users"] = len(ALL_USERS)
     
     # Other stats would be updated during normal operations
 
+def get_statistics() -> Dict[str, Any]:
+    """Combine the live counters with the periodically refreshed statistics"""
+    return {
+        **STATISTICS,
+        "total_messages": config.TOTAL_MESSAGES,
+        "connections_made": config.CONNECTIONS_MADE,
+        "groups_created": config.GROUPS_CREATED
+    }
+
 def get_system_status() -> Dict[str, Any]:
     """Get system status information for admin dashboard"""
-    now = datetime.now()
-    uptime = now - BOT_STARTED_AT
-    uptime_str = str(uptime).split('.')[0]  # Remove microseconds
+    mono_now = time.monotonic()
+    if _STATUS_CACHE["data"] is not None and mono_now - _STATUS_CACHE["ts"] < _status_cache_ttl():
+        return _STATUS_CACHE["data"]
     
-    return {
+    uptime_str = str(timedelta(seconds=int(mono_now - BOT_STARTED_AT_MONO)))
+    
+    status = {
         "version": BOT_VERSION,
         "uptime": uptime_str,
-        "platform": platform.platform(),
-        "python": platform.python_version(),
-        "connections": len(ACTIVE_CONNECTIONS) // 2,  # Divide by 2 as each connection is counted twice
-        "waiting_users": len(WAITING_USERS) + sum(len(users) for users in WAITING_BY_TOPIC.values()),
+        "platform": _PLATFORM,
+        "python": _PYVER,
+        "connections": len(ACTIVE_PAIRS),
+        "waiting_users": len(WAITING_TICKETS) + len(WAITING_TOPIC_OF),
         "total_users": len(ALL_USERS),
         "active_groups": len(GROUP_CHATS),
         "maintenance_mode": SYSTEM_CONFIG["maintenance_mode"],
-        "banned_users": len(BANNED_USERS)
+        "banned_users": len(BANNED_USERS_MUTABLE)
     }
+    
+    _STATUS_CACHE["data"] = status
+    _STATUS_CACHE["ts"] = mono_now
+    return status
 
 async def toggle_maintenance_mode(admin_id: int, enable: bool) -> None:
     """Enable or disable maintenance mode"""
     SYSTEM_CONFIG["maintenance_mode"] = enable
+    invalidate_status_cache()
     
     # Log the action
     action = "enable_maintenance" if enable else "disable_maintenance"
@@ -93,15 +161,22 @@ async def toggle_maintenance_mode(admin_id: int, enable: bool) -> None:
     
     # If enabling maintenance, disconnect all non-admin users
     if enable:
-        for user_id in list(ACTIVE_CONNECTIONS.keys()):
-            if user_id not in ADMIN_IDS:
-                partner_id = ACTIVE_CONNECTIONS.get(user_id)
-                if partner_id and partner_id not in ADMIN_IDS:
-                    # Both users are non-admins, disconnect them
-                    if user_id in ACTIVE_CONNECTIONS:
-                        del ACTIVE_CONNECTIONS[user_id]
-                    if partner_id in ACTIVE_CONNECTIONS:
-                        del ACTIVE_CONNECTIONS[partner_id]
+        # Each pair is visited once; pairs with an admin in them are left alone
+        for a, b in list(ACTIVE_PAIRS):
+            if a in ADMIN_IDS or b in ADMIN_IDS:
+                continue
+            unpair_user(a)
+
+def _publish_banned_users() -> None:
+    """Rebind the read-only banned users snapshot after a ban or unban"""
+    config.BANNED_USERS = frozenset(BANNED_USERS_MUTABLE)
+
+def _rebuild_banned_words_re() -> None:
+    """Recompile the banned words pattern after the list changes"""
+    words = SYSTEM_CONFIG["banned_words"]
+    config.BANNED_WORDS_RE = (
+        re.compile("|".join(map(re.escape, words)), re.IGNORECASE) if words else None
+    )
 
 async def ban_user(admin_id: int, target_user_id: int, reason: str = "") -> bool:
     """Ban a user from using the bot"""
@@ -110,43 +185,43 @@ async def ban_user(admin_id: int, target_user_id: int, reason: str = "") -> bool
         return False
     
     # Add to banned list
-    BANNED_USERS.add(target_user_id)
+    BANNED_USERS_MUTABLE.add(target_user_id)
+    _publish_banned_users()
+    invalidate_status_cache()
     
     # Log the action
     log_admin_action(admin_id, "ban_user", f"User ID: {target_user_id}, Reason: {reason}")
     
     # Disconnect the user if they're in a conversation
-    if target_user_id in ACTIVE_CONNECTIONS:
-        partner_id = ACTIVE_CONNECTIONS[target_user_id]
-        
-        # Remove from active connections
-        if target_user_id in ACTIVE_CONNECTIONS:
-            del ACTIVE_CONNECTIONS[target_user_id]
-        if partner_id in ACTIVE_CONNECTIONS:
-            del ACTIVE_CONNECTIONS[partner_id]
+    unpair_user(target_user_id)
     
     # Remove from any waiting lists
-    if target_user_id in WAITING_USERS:
-        WAITING_USERS.remove(target_user_id)
+    remove_waiting(target_user_id)
     
-    for topic, users in WAITING_BY_TOPIC.items():
-        if target_user_id in users:
-            users.remove(target_user_id)
+    remove_topic_waiting(target_user_id)
     
     # Remove from any groups
-    for group_id, group in list(GROUP_CHATS.items()):
-        if target_user_id in group.members:
-            group.members.remove(target_user_id)
-            # If the group is now empty, delete it
-            if not group.members:
-                del GROUP_CHATS[group_id]
+    for group_id in USER_GROUPS.pop(target_user_id, ()):
+        group = GROUP_CHATS.get(group_id)
+        if group is None:
+            continue
+        group.remove_member(target_user_id)
+        # If the group is now empty, delete it
+        if not group.members:
+            del GROUP_CHATS[group_id]
+            bump_group_state()
+    
+    # Drop the group preference too, or an unbanned user would keep posting to a group they left
+    reset_group_preference(target_user_id)
     
     return True
 
 async def unban_user(admin_id: int, target_user_id: int) -> bool:
     """Unban a user"""
-    if target_user_id in BANNED_USERS:
-        BANNED_USERS.remove(target_user_id)
+    if target_user_id in BANNED_USERS_MUTABLE:
+        BANNED_USERS_MUTABLE.remove(target_user_id)
+        _publish_banned_users()
+        invalidate_status_cache()
         log_admin_action(admin_id, "unban_user", f"User ID: {target_user_id}")
         return True
     return False
@@ -157,18 +232,17 @@ async def get_user_info(user_id: int) -> Dict[str, Any]:
     if not user:
         return {"error": "User not found"}
     
-    prefs = USER_PREFERENCES.get(user_id, {})
-    mode = prefs.get('mode', ChatMode.ONE_ON_ONE)
+    prefs = USER_PREFERENCES.get(user_id) or UserPref()
+    mode = prefs.mode
     
     is_connected = user_id in ACTIVE_CONNECTIONS
-    is_waiting = (user_id in WAITING_USERS or 
-                 any(user_id in users for users in WAITING_BY_TOPIC.values()))
+    is_waiting = user_id in WAITING_TICKETS or user_id in WAITING_TOPIC_OF
     
     in_group = False
     group_info = None
-    if prefs.get('group_id') in GROUP_CHATS:
+    if prefs.group_id in GROUP_CHATS:
         in_group = True
-        group = GROUP_CHATS[prefs['group_id']]
+        group = GROUP_CHATS[prefs.group_id]
         group_info = {
             "id": group.id,
             "name": group.name,
@@ -181,9 +255,9 @@ async def get_user_info(user_id: int) -> Dict[str, Any]:
         "username": user.username,
         "first_name": user.first_name,
         "last_name": user.last_name,
-        "is_banned": user_id in BANNED_USERS,
+        "is_banned": user_id in BANNED_USERS_MUTABLE,
         "chat_mode": mode.value if mode else "unknown",
-        "topic": prefs.get('topic'),
+        "topic": prefs.topic,
         "is_connected": is_connected,
         "is_waiting": is_waiting,
         "in_group": in_group,
@@ -191,106 +265,163 @@ async def get_user_info(user_id: int) -> Dict[str, Any]:
         "is_admin": is_admin(user_id)
     }
 
+# Admin command templates and keyboards - built once at import instead of per call
+_DASHBOARD_TEMPLATE = (
+    "🛠️ *ADMIN DASHBOARD*\n\n"
+    "🤖 *Bot Status*\n"
+    "Version: {version}\n"
+    "Uptime: {uptime}\n"
+    "Platform: {platform}\n"
+    "Python: {python}\n\n"
+    
+    "👥 *Users and Connections*\n"
+    "Total Users: {total_users}\n"
+    "Active Connections: {connections}\n"
+    "Waiting Users: {waiting_users}\n"
+    "Active Groups: {active_groups}\n"
+    "Banned Users: {banned_users}\n\n"
+    
+    "📊 *Statistics*\n"
+    "Messages Today: {total_messages}\n"
+    "Connections Made: {connections_made}\n"
+    "Active Today: {active_users_today}\n"
+    "Groups Created: {groups_created}\n\n"
+    
+    "⚙️ *System Configuration*\n"
+    "Maintenance Mode: {maintenance}\n"
+    "Connection Timeout: {connection_timeout}s\n"
+    "Max Group Size: {max_group_size}\n"
+    "Banned Words: {banned_words}\n"
+)
+
+_DASHBOARD_KB_HEAD = (
+    (
+        InlineKeyboardButton("👤 User Management", callback_data="admin_users"),
+        InlineKeyboardButton("📊 Statistics", callback_data="admin_stats")
+    ),
+    (
+        InlineKeyboardButton("📢 Broadcast", callback_data="admin_broadcast"),
+        InlineKeyboardButton("⚙️ System Config", callback_data="admin_config")
+    )
+)
+
+_DASHBOARD_KB_TAIL = (
+    (InlineKeyboardButton("📜 View Logs", callback_data="admin_logs"),),
+)
+
+# Dashboard keyboards keyed by whether maintenance mode is currently on
+_DASHBOARD_MARKUPS = {
+    True: InlineKeyboardMarkup(
+        _DASHBOARD_KB_HEAD
+        + ((InlineKeyboardButton("🟢 Disable Maintenance Mode", callback_data="admin_maint_off"),),)
+        + _DASHBOARD_KB_TAIL
+    ),
+    False: InlineKeyboardMarkup(
+        _DASHBOARD_KB_HEAD
+        + ((InlineKeyboardButton("🔴 Enable Maintenance Mode", callback_data="admin_maint_on"),),)
+        + _DASHBOARD_KB_TAIL
+    )
+}
+
+# Back buttons shared by the admin keyboards, so no callback rebuilds them
+_BACK_TO_DASHBOARD_ROW = (InlineKeyboardButton("↩️ Back to Dashboard", callback_data="admin_dashboard"),)
+_BACK_TO_USERS_ROW = (InlineKeyboardButton("↩️ Back to User Management", callback_data="admin_users"),)
+_BACK_TO_CONFIG_ROW = (InlineKeyboardButton("↩️ Back to System Config", callback_data="admin_config"),)
+
+_USER_MGMT_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("🔍 Search User", callback_data="admin_search_user"),
+        InlineKeyboardButton("🚫 View Banned", callback_data="admin_view_banned")
+    ],
+    [
+        InlineKeyboardButton("👥 Active Users", callback_data="admin_active_users"),
+        InlineKeyboardButton("👥 Waiting Users", callback_data="admin_waiting_users")
+    ],
+    _BACK_TO_DASHBOARD_ROW
+])
+
+_BROADCAST_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("👥 All Users", callback_data="admin_broadcast_all"),
+        InlineKeyboardButton("💬 Active Users", callback_data="admin_broadcast_active")
+    ],
+    [
+        InlineKeyboardButton("⏳ Waiting Users", callback_data="admin_broadcast_waiting"),
+        InlineKeyboardButton("👪 Group Members", callback_data="admin_broadcast_groups")
+    ],
+    _BACK_TO_DASHBOARD_ROW
+])
+
+_CONFIG_MARKUP = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("⏱️ Set Timeout: 30s", callback_data="admin_set_timeout_30"),
+        InlineKeyboardButton("⏱️ Set Timeout: 60s", callback_data="admin_set_timeout_60")
+    ],
+    [
+        InlineKeyboardButton("👥 Group Size: 5", callback_data="admin_set_group_5"),
+        InlineKeyboardButton("👥 Group Size: 10", callback_data="admin_set_group_10")
+    ],
+    [
+        InlineKeyboardButton("📜 Manage Banned Words", callback_data="admin_banned_words"),
+    ],
+    _BACK_TO_DASHBOARD_ROW
+])
+
+# Single back buttons shown under the result of an admin action
+_BACK_TO_DASHBOARD_MARKUP = InlineKeyboardMarkup((_BACK_TO_DASHBOARD_ROW,))
+_BACK_TO_USERS_MARKUP = InlineKeyboardMarkup((_BACK_TO_USERS_ROW,))
+_BACK_TO_CONFIG_MARKUP = InlineKeyboardMarkup((_BACK_TO_CONFIG_ROW,))
+
+# Broadcasts skip link unfurling, which dominates Telegram's per-send latency
+_NO_LINK_PREVIEW = LinkPreviewOptions(is_disabled=True)
+
 # Admin command handlers
+@require_admin(denied_text="⚠️ You don't have permission to access the admin dashboard.")
 async def admin_dashboard(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Display the admin dashboard"""
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     
-    # Check if user is an admin
-    if not is_admin(user_id):
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text="⚠️ You don't have permission to access the admin dashboard."
-        )
-        return
-    
     # Update statistics
     await update_statistics()
     
     # Get system status
     status = get_system_status()
     
-    # Create fancy dashboard message with statistics
-    dashboard_text = (
-        f"🛠️ *ADMIN DASHBOARD*\n\n"
-        f"🤖 *Bot Status*\n"
-        f"Version: {status['version']}\n"
-        f"Uptime: {status['uptime']}\n"
-        f"Platform: {status['platform']}\n"
-        f"Python: {status['python']}\n\n"
-        
-        f"👥 *Users and Connections*\n"
-        f"Total Users: {status['total_users']}\n"
-        f"Active Connections: {status['connections']}\n"
-        f"Waiting Users: {status['waiting_users']}\n"
-        f"Active Groups: {status['active_groups']}\n"
-        f"Banned Users: {status['banned_users']}\n\n"
-        
-        f"📊 *Statistics*\n"
-        f"Messages Today: {STATISTICS['total_messages']}\n"
-        f"Connections Made: {STATISTICS['connections_made']}\n"
-        f"Active Today: {STATISTICS['active_users_today']}\n"
-        f"Groups Created: {STATISTICS['groups_created']}\n\n"
-        
-        f"⚙️ *System Configuration*\n"
-        f"Maintenance Mode: {'✅ ON' if status['maintenance_mode'] else '❌ OFF'}\n"
-        f"Connection Timeout: {SYSTEM_CONFIG['connection_timeout']}s\n"
-        f"Max Group Size: {SYSTEM_CONFIG['max_group_size']}\n"
-        f"Banned Words: {len(SYSTEM_CONFIG['banned_words'])}\n"
-    )
-    
-    # Create admin action buttons
-    keyboard = [
-        [
-            InlineKeyboardButton("👤 User Management", callback_data="admin_users"),
-            InlineKeyboardButton("📊 Statistics", callback_data="admin_stats")
-        ],
-        [
-            InlineKeyboardButton("📢 Broadcast", callback_data="admin_broadcast"),
-            InlineKeyboardButton("⚙️ System Config", callback_data="admin_config")
-        ]
-    ]
-    
-    # Add maintenance mode toggle button
-    if status['maintenance_mode']:
-        keyboard.append([InlineKeyboardButton("🟢 Disable Maintenance Mode", callback_data="admin_maint_off")])
-    else:
-        keyboard.append([InlineKeyboardButton("🔴 Enable Maintenance Mode", callback_data="admin_maint_on")])
-    
-    # Add system logs button
-    keyboard.append([InlineKeyboardButton("📜 View Logs", callback_data="admin_logs")])
+    # Fill in the dashboard template with statistics
+    dashboard_text = _DASHBOARD_TEMPLATE.format_map({
+        **get_statistics(),
+        **status,
+        "maintenance": '✅ ON' if status['maintenance_mode'] else '❌ OFF',
+        "connection_timeout": SYSTEM_CONFIG['connection_timeout'],
+        "max_group_size": SYSTEM_CONFIG['max_group_size'],
+        "banned_words": len(SYSTEM_CONFIG['banned_words'])
+    })
     
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    # Pick the admin action buttons for the current maintenance state
+    reply_markup = _DASHBOARD_MARKUPS[bool(status['maintenance_mode'])]
     
     # Send the dashboard
     await context.bot.send_message(
         chat_id=chat_id,
         text=dashboard_text,
         reply_markup=reply_markup,
-        parse_mode='Markdown'
+        parse_mode=ParseMode.MARKDOWN
     )
     
     # Log admin dashboard access
     log_admin_action(user_id, "access_dashboard")
 
+@require_admin("user_mgmt", denied_text="⚠️ You don't have permission to manage users.")
 async def admin_user_management(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Display user management interface"""
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     
-    # Check if user is an admin with user management privileges
-    if not is_admin(user_id) or not has_privilege(user_id, "user_mgmt"):
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text="⚠️ You don't have permission to manage users."
-        )
-        return
-    
     # Create user management interface
     # Show total users and options to search, ban/unban
     user_count = len(ALL_USERS)
-    banned_count = len(BANNED_USERS)
+    banned_count = len(BANNED_USERS_MUTABLE)
     
     management_text = (
         f"👤 *USER MANAGEMENT*\n\n"
@@ -300,45 +431,25 @@ async def admin_user_management(update: Update, context: ContextTypes.DEFAULT_TY
         f"`/admin_find_user <user_id or username>`"
     )
     
-    # Create action buttons
-    keyboard = [
-        [
-            InlineKeyboardButton("🔍 Search User", callback_data="admin_search_user"),
-            InlineKeyboardButton("🚫 View Banned", callback_data="admin_view_banned")
-        ],
-        [
-            InlineKeyboardButton("👥 Active Users", callback_data="admin_active_users"),
-            InlineKeyboardButton("👥 Waiting Users", callback_data="admin_waiting_users")
-        ],
-        [InlineKeyboardButton("↩️ Back to Dashboard", callback_data="admin_dashboard")]
-    ]
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = _USER_MGMT_MARKUP
     
     # Send the management interface
     await context.bot.send_message(
         chat_id=chat_id,
         text=management_text,
         reply_markup=reply_markup,
-        parse_mode='Markdown'
+        parse_mode=ParseMode.MARKDOWN
     )
     
     # Log admin user management access
     log_admin_action(user_id, "access_user_management")
 
+@require_admin("broadcast", denied_text="⚠️ You don't have permission to broadcast messages.")
 async def admin_broadcast_message(update: Update, context: ContextTypes.DEFAULT_TYPE, target: str = None) -> None:
     """Enhanced broadcast messaging with targeting options"""
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     
-    # Check if user is an admin with broadcast privileges
-    if not is_admin(user_id) or not has_privilege(user_id, "broadcast"):
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text="⚠️ You don't have permission to broadcast messages."
-        )
-        return
-        
     # If a specific target is specified (from command handler), handle the broadcast now
     if target:
         # Get the message
@@ -353,36 +464,26 @@ async def admin_broadcast_message(update: Update, context: ContextTypes.DEFAULT_
         message = ' '.join(context.args)
         
         # Different targeting options
-        if target == "all":
-            # Broadcast to all users
-            target_users = list(ALL_USERS.keys())
-            target_name = "all users"
-        elif target == "active":
+        if target == "active":
             # Only users in active connections
-            target_users = list(ACTIVE_CONNECTIONS.keys())
+            approx_count = 2 * len(ACTIVE_PAIRS)
             target_name = "active users"
         elif target == "waiting":
             # Only users waiting for a match
-            target_users = WAITING_USERS + [
-                user_id for topic_users in WAITING_BY_TOPIC.values() for user_id in topic_users
-            ]
+            approx_count = len(WAITING_TICKETS) + len(WAITING_TOPIC_OF)
             target_name = "waiting users"
         elif target == "groups":
             # Only users in group chats
-            target_users = []
-            for group in GROUP_CHATS.values():
-                target_users.extend(list(group.members))
+            approx_count = sum(len(group.members) for group in GROUP_CHATS.values())
             target_name = "group members"
         else:
             # Default to all users
-            target_users = list(ALL_USERS.keys())
+            target = "all"
+            approx_count = len(ALL_USERS)
             target_name = "all users"
         
-        # Remove duplicates
-        target_users = list(set(target_users))
-        
         # Broadcast
-        await send_broadcast(update, context, message, target_users, target_name)
+        await send_broadcast(update, context, message, _iter_targets(target), approx_count, target_name)
         return
     
     # Show broadcast options
@@ -400,34 +501,47 @@ async def admin_broadcast_message(update: Update, context: ContextTypes.DEFAULT_
         f"`/broadcast_groups <message>` - Send to group chat members"
     )
     
-    # Create buttons for different broadcast options
-    keyboard = [
-        [
-            InlineKeyboardButton("👥 All Users", callback_data="admin_broadcast_all"),
-            InlineKeyboardButton("💬 Active Users", callback_data="admin_broadcast_active")
-        ],
-        [
-            InlineKeyboardButton("⏳ Waiting Users", callback_data="admin_broadcast_waiting"),
-            InlineKeyboardButton("👪 Group Members", callback_data="admin_broadcast_groups")
-        ],
-        [InlineKeyboardButton("↩️ Back to Dashboard", callback_data="admin_dashboard")]
-    ]
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = _BROADCAST_MARKUP
     
     # Send the broadcast interface
     await context.bot.send_message(
         chat_id=chat_id,
         text=broadcast_text,
         reply_markup=reply_markup,
-        parse_mode='Markdown'
+        parse_mode=ParseMode.MARKDOWN
     )
     
     # Log admin broadcast access
     log_admin_action(user_id, "access_broadcast_interface")
 
-async def send_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE, message: str, target_users: List[int], target_name: str) -> None:
-    """Helper function to send a broadcast message to a list of users"""
+def _iter_targets(target: str) -> Iterator[int]:
+    """Yield the unique user IDs covered by a broadcast target"""
+    # Each source is copied to a tuple of IDs before yielding: users keep connecting and
+    # registering while the broadcast awaits, and a live dict or set iterator would raise.
+    # The copy still grows with the number of users; only the pending sends are chunked
+    if target == "active":
+        # Every chatting user sits in exactly one pair, so no dedup is needed
+        for pair in tuple(ACTIVE_PAIRS):
+            yield from pair
+    elif target == "waiting":
+        seen = set()
+        for target_id in itertools.chain(tuple(WAITING_TICKETS), tuple(WAITING_TOPIC_OF)):
+            if target_id not in seen:
+                seen.add(target_id)
+                yield target_id
+    elif target == "groups":
+        seen = set()
+        for group in tuple(GROUP_CHATS.values()):
+            for target_id in tuple(group.members):
+                if target_id not in seen:
+                    seen.add(target_id)
+                    yield target_id
+    else:
+        # Dict keys are already unique
+        yield from tuple(ALL_USERS)
+
+async def send_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE, message: str, target_iter: Iterable[int], approx_count: int, target_name: str, header: str = "📢 *ADMIN BROADCAST*") -> None:
+    """Helper function to send a broadcast message to a stream of users"""
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     
@@ -439,62 +553,100 @@ async def send_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE, mes
         )
         return
     
+    # Nothing to do if nobody matches the target - skip the progress message entirely
+    if approx_count == 0:
+        await context.bot.send_message(
+            chat_id=chat_id,
+            text=f"⚠️ There are no {target_name} to broadcast to."
+        )
+        return
+    
     # Format the broadcast message with header
-    broadcast_message = (
-        f"📢 *ADMIN BROADCAST*\n\n"
-        f"{message}"
-    )
+    broadcast_message = f"{header}\n\n{message}"
     
     # Count successful deliveries
     sent_count = 0
     
     # Send to all targeted users - with progress updates for large broadcasts
-    total_users = len(target_users)
+    total_users = approx_count
     progress_message = await context.bot.send_message(
         chat_id=chat_id,
         text=f"🔄 Sending broadcast to {total_users} {target_name}... (0%)"
     )
     
-    for idx, target_id in enumerate(target_users):
+    # Fan the sends out concurrently; the semaphore bounds in-flight requests and the
+    # application's rate limiter paces them under Telegram's flood limits
+    semaphore = asyncio.Semaphore(SYSTEM_CONFIG.get("broadcast_concurrency", 25))
+    silent = SYSTEM_CONFIG.get("broadcast_silent", False)
+    
+    async def send_one(target_id: int) -> int:
+        async with semaphore:
+            try:
+                await context.bot.send_message(
+                    chat_id=target_id,
+                    text=broadcast_message,
+                    parse_mode=ParseMode.MARKDOWN,
+                    link_preview_options=_NO_LINK_PREVIEW,
+                    disable_notification=silent
+                )
+                return 1
+            except Exception as e:
+                logger.error(f"Failed to send broadcast to user {target_id}: {e}")
+                return 0
+    
+    async def report_progress(done: int) -> None:
+        progress = min(100.0, done / total_users * 100)
         try:
-            await context.bot.send_message(
-                chat_id=target_id,
-                text=broadcast_message,
-                parse_mode='Markdown'
+            await progress_message.edit_text(
+                f"🔄 Sending broadcast to {total_users} {target_name}... ({progress:.1f}%)"
             )
-            sent_count += 1
-            
-            # Update progress for large broadcasts (every 5% or 20 users)
-            if total_users > 20 and (idx + 1) % max(1, total_users // 20) == 0:
-                progress = (idx + 1) / total_users * 100
-                await progress_message.edit_text(
-                    f"🔄 Sending broadcast to {total_users} {target_name}... ({progress:.1f}%)"
-                )
-                
         except Exception as e:
-            logger.error(f"Failed to send broadcast to user {target_id}: {e}")
+            logger.error(f"Failed to update broadcast progress: {e}")
+    
+    # Progress edits are throttled by wall clock and run in the background so they never stall the sends
+    progress_interval = SYSTEM_CONFIG.get("broadcast_progress_interval", 2.0)
+    last_progress = time.monotonic()
+    progress_task = None
+    completed = 0
+    
+    # Work through the targets a chunk at a time so only one chunk of pending sends is held in memory
+    chunk_size = max(1, SYSTEM_CONFIG.get("broadcast_chunk_size", 500))
+    target_iter = iter(target_iter)
+    
+    while True:
+        chunk = list(itertools.islice(target_iter, chunk_size))
+        if not chunk:
+            break
+        
+        for finished in asyncio.as_completed([send_one(target_id) for target_id in chunk]):
+            sent_count += await finished
+            completed += 1
+            
+            # Update progress for large broadcasts
+            if total_users > 20 and (progress_task is None or progress_task.done()):
+                now = time.monotonic()
+                if now - last_progress >= progress_interval:
+                    last_progress = now
+                    progress_task = asyncio.create_task(report_progress(completed))
+    
+    # Let any in-flight progress edit land before the final result replaces it
+    if progress_task is not None:
+        await progress_task
     
     # Update with final result
     await progress_message.edit_text(
-        f"✅ Broadcast sent to {sent_count}/{total_users} {target_name}."
+        f"✅ Broadcast sent to {sent_count}/{completed} {target_name}."
     )
     
     # Log the broadcast
     log_admin_action(user_id, "broadcast", f"Sent to {sent_count} {target_name}: {message[:50]}...")
 
+@require_admin("system_mgmt", denied_text="⚠️ You don't have permission to modify system configuration.")
 async def admin_system_config(update: Update, context: ContextTypes.DEFAULT_TYPE, action: str = None) -> None:
     """Interface for changing system configuration"""
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     
-    # Check if user is an admin with system management privileges
-    if not is_admin(user_id) or not has_privilege(user_id, "system_mgmt"):
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text="⚠️ You don't have permission to modify system configuration."
-        )
-        return
-    
     # Handle specific configuration actions if provided
     if action:
         if not context.args:
@@ -563,7 +715,8 @@ async def admin_system_config(update: Update, context: ContextTypes.DEFAULT_TYPE
                 )
                 return
                 
-            SYSTEM_CONFIG["banned_words"].append(word)
+            SYSTEM_CONFIG["banned_words"].add(word)
+            _rebuild_banned_words_re()
             log_admin_action(user_id, "change_config", f"Added banned word: {word}")
             
             await context.bot.send_message(
@@ -580,7 +733,8 @@ async def admin_system_config(update: Update, context: ContextTypes.DEFAULT_TYPE
                 )
                 return
                 
-            SYSTEM_CONFIG["banned_words"].remove(word)
+            SYSTEM_CONFIG["banned_words"].discard(word)
+            _rebuild_banned_words_re()
             log_admin_action(user_id, "change_config", f"Removed banned word: {word}")
             
             await context.bot.send_message(
@@ -613,48 +767,25 @@ async def admin_system_config(update: Update, context: ContextTypes.DEFAULT_TYPE
         f"`/remove_banned_word <word>` - Remove a banned word"
     )
     
-    # Create buttons for common configuration changes
-    keyboard = [
-        [
-            InlineKeyboardButton("⏱️ Set Timeout: 30s", callback_data="admin_set_timeout_30"),
-            InlineKeyboardButton("⏱️ Set Timeout: 60s", callback_data="admin_set_timeout_60")
-        ],
-        [
-            InlineKeyboardButton("👥 Group Size: 5", callback_data="admin_set_group_5"),
-            InlineKeyboardButton("👥 Group Size: 10", callback_data="admin_set_group_10")
-        ],
-        [
-            InlineKeyboardButton("📜 Manage Banned Words", callback_data="admin_banned_words"),
-        ],
-        [InlineKeyboardButton("↩️ Back to Dashboard", callback_data="admin_dashboard")]
-    ]
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
+    reply_markup = _CONFIG_MARKUP
     
     # Send the configuration interface
     await context.bot.send_message(
         chat_id=chat_id,
         text=config_text,
         reply_markup=reply_markup,
-        parse_mode='Markdown'
+        parse_mode=ParseMode.MARKDOWN
     )
     
     # Log admin config access
     log_admin_action(user_id, "access_system_config")
 
+@require_admin("user_mgmt", denied_text="⚠️ You don't have permission to view user information.")
 async def admin_find_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Search for and display user information"""
     user_id = update.effective_user.id
     chat_id = update.effective_chat.id
     
-    # Check if user is an admin with user management privileges
-    if not is_admin(user_id) or not has_privilege(user_id, "user_mgmt"):
-        await context.bot.send_message(
-            chat_id=chat_id,
-            text="⚠️ You don't have permission to view user information."
-        )
-        return
-    
     # Check if there's a search term
     if not context.args:
         await context.bot.send_message(
@@ -674,10 +805,7 @@ async def admin_find_user(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             target_user_id = None
     except ValueError:
         # Search by username
-        for uid, user in ALL_USERS.items():
-            if user.username and user.username.lower() == search_term.lower().lstrip('@'):
-                target_user_id = uid
-                break
+        target_user_id = USERNAME_INDEX.get(search_term.lower().lstrip('@'))
     
     if not target_user_id:
         await context.bot.send_message(
@@ -741,7 +869,7 @@ async def admin_find_user(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         keyboard.append([InlineKeyboardButton("👋 Remove from Group", callback_data=f"admin_remove_group_{target_user_id}")])
     
     # Back button
-    keyboard.append([InlineKeyboardButton("↩️ Back to User Management", callback_data="admin_users")])
+    keyboard.append(_BACK_TO_USERS_ROW)
     
     reply_markup = InlineKeyboardMarkup(keyboard)
     
@@ -750,128 +878,259 @@ async def admin_find_user(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         chat_id=chat_id,
         text=info_text,
         reply_markup=reply_markup,
-        parse_mode='Markdown'
+        parse_mode=ParseMode.MARKDOWN
     )
     
     # Log admin user search
     log_admin_action(user_id, "search_user", f"Searched for: {search_term}")
 
-# Helper function for admin actions via callback queries
-async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle admin dashboard callback queries"""
-    query = update.callback_query
-    await query.answer()
-    
-    user_id = update.effective_user.id
-    data = query.data
-    
-    # Check if user is an admin
-    if not is_admin(user_id):
-        await query.edit_message_text(
-            text="⚠️ You don't have permission to access admin features."
-        )
-        return
+# Admin callback actions - looked up by handle_admin_callback
+# Number of audit log entries shown by the "View Logs" button
+_RECENT_LOGS_SHOWN = 20
+
+async def _maint_on_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Enable maintenance mode from the dashboard"""
+    await toggle_maintenance_mode(update.effective_user.id, True)
+    await update.callback_query.edit_message_text(
+        text="✅ Maintenance mode enabled. Only admins can use the bot now.",
+        reply_markup=_BACK_TO_DASHBOARD_MARKUP
+    )
+
+async def _maint_off_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Disable maintenance mode from the dashboard"""
+    await toggle_maintenance_mode(update.effective_user.id, False)
+    await update.callback_query.edit_message_text(
+        text="✅ Maintenance mode disabled. All users can use the bot now.",
+        reply_markup=_BACK_TO_DASHBOARD_MARKUP
+    )
+
+async def _view_logs_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Show the most recent admin actions from the dashboard"""
+    # Newest first, without copying the whole ring buffer
+    recent = itertools.islice(reversed(ADMIN_LOGS), _RECENT_LOGS_SHOWN)
+    lines = [
+        f"{datetime.fromtimestamp(entry['timestamp']).strftime('%Y-%m-%d %H:%M:%S')} "
+        f"[{entry['admin_id']}] {entry['action']}"
+        + (f" - {entry['details']}" if entry['details'] else "")
+        for entry in recent
+    ]
     
-    # Handle different admin callbacks
-    if data == "admin_dashboard":
-        await admin_dashboard(update, context)
+    text = "📜 Recent Admin Actions\n\n" + ("\n".join(lines) if lines else "No admin actions logged yet.")
+    await update.callback_query.edit_message_text(
+        text=text,
+        reply_markup=_BACK_TO_DASHBOARD_MARKUP
+    )
+
+async def _do_ban(update: Update, context: ContextTypes.DEFAULT_TYPE, target_id: int) -> None:
+    """Ban a user from the user information view"""
+    success = await ban_user(update.effective_user.id, target_id)
     
-    elif data == "admin_users":
-        await admin_user_management(update, context)
+    if success:
+        text = f"✅ User {target_id} has been banned successfully."
+    else:
+        text = f"❌ Failed to ban user {target_id}. User might not exist."
     
-    elif data == "admin_broadcast":
-        await admin_broadcast_message(update, context)
+    await update.callback_query.edit_message_text(
+        text=text,
+        reply_markup=_BACK_TO_USERS_MARKUP
+    )
+
+async def _do_unban(update: Update, context: ContextTypes.DEFAULT_TYPE, target_id: int) -> None:
+    """Unban a user from the user information view"""
+    success = await unban_user(update.effective_user.id, target_id)
     
-    elif data == "admin_config":
-        await admin_system_config(update, context)
+    if success:
+        text = f"✅ User {target_id} has been unbanned successfully."
+    else:
+        text = f"❌ User {target_id} was not banned or does not exist."
     
-    elif data == "admin_maint_on":
-        await toggle_maintenance_mode(user_id, True)
-        await query.edit_message_text(
-            text="✅ Maintenance mode enabled. Only admins can use the bot now.",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("↩️ Back to Dashboard", callback_data="admin_dashboard")
-            ]])
-        )
+    await update.callback_query.edit_message_text(
+        text=text,
+        reply_markup=_BACK_TO_USERS_MARKUP
+    )
+
+async def _do_remove_waiting(update: Update, context: ContextTypes.DEFAULT_TYPE, target_id: int) -> None:
+    """Take a user out of the waiting queues from the user information view"""
+    was_waiting = False
+    
+    if remove_waiting(target_id):
+        was_waiting = True
+    if remove_topic_waiting(target_id) is not None:
+        was_waiting = True
+    WAITING_SINCE.pop(target_id, None)
+    
+    if was_waiting:
+        log_admin_action(update.effective_user.id, "remove_waiting", f"User ID: {target_id}")
+        invalidate_status_cache()
+        text = f"✅ User {target_id} has been removed from the waiting queue."
+    else:
+        text = f"❌ User {target_id} is not waiting for a match."
     
-    elif data == "admin_maint_off":
-        await toggle_maintenance_mode(user_id, False)
-        await query.edit_message_text(
-            text="✅ Maintenance mode disabled. All users can use the bot now.",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("↩️ Back to Dashboard", callback_data="admin_dashboard")
-            ]])
+    await update.callback_query.edit_message_text(
+        text=text,
+        reply_markup=_BACK_TO_USERS_MARKUP
+    )
+
+async def _do_disconnect(update: Update, context: ContextTypes.DEFAULT_TYPE, target_id: int) -> None:
+    """End a user's one-on-one conversation from the user information view"""
+    partner_id = ACTIVE_CONNECTIONS.get(target_id)
+    
+    if partner_id is not None:
+        disconnect_users(target_id, partner_id)
+        log_admin_action(update.effective_user.id, "disconnect_user", f"User ID: {target_id}")
+        invalidate_status_cache()
+        text = f"✅ User {target_id} has been disconnected from their chat partner."
+        
+        # Both sides get the same notices as a /disconnect (handlers imports admin, so import it here)
+        from handlers import _CHAT_ENDED_MARKUP
+        results = await asyncio.gather(
+            context.bot.send_message(
+                chat_id=target_id,
+                text="✅ *Chat ended*\n\nYou have been disconnected from your chat partner.\n\nWould you like to find someone new to talk to?",
+                reply_markup=_CHAT_ENDED_MARKUP,
+                parse_mode=ParseMode.MARKDOWN
+            ),
+            context.bot.send_message(
+                chat_id=partner_id,
+                text="👋 *Your partner has disconnected*\n\nThis conversation has ended.\n\n💬 Ready for a new conversation?",
+                reply_markup=_CHAT_ENDED_MARKUP,
+                parse_mode=ParseMode.MARKDOWN
+            ),
+            return_exceptions=True
         )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.error(f"Error sending disconnect notice: {result}")
+    else:
+        text = f"❌ User {target_id} is not in an active conversation."
     
-    # Handle ban/unban callbacks
-    elif data.startswith("admin_ban_"):
-        target_id = int(data.split("_")[2])
-        success = await ban_user(user_id, target_id)
+    await update.callback_query.edit_message_text(
+        text=text,
+        reply_markup=_BACK_TO_USERS_MARKUP
+    )
+
+async def _do_remove_group(update: Update, context: ContextTypes.DEFAULT_TYPE, target_id: int) -> None:
+    """Remove a user from their group chats from the user information view"""
+    group_ids = list(USER_GROUPS.get(target_id, ()))
+    
+    # Tell the removed user and the remaining members, as /leave does (handlers imports admin, so import it here)
+    from handlers import _send_to_group_members
+    sends = []
+    for group_id in group_ids:
+        group = GROUP_CHATS.get(group_id)
+        if group is None:
+            continue
+        group_name = group.name
+        result = leave_group(target_id, group_id)
+        if not result:
+            continue
         
-        if success:
-            await query.edit_message_text(
-                text=f"✅ User {target_id} has been banned successfully.",
-                reply_markup=InlineKeyboardMarkup([[
-                    InlineKeyboardButton("↩️ Back to User Management", callback_data="admin_users")
-                ]])
-            )
-        else:
-            await query.edit_message_text(
-                text=f"❌ Failed to ban user {target_id}. User might not exist.",
-                reply_markup=InlineKeyboardMarkup([[
-                    InlineKeyboardButton("↩️ Back to User Management", callback_data="admin_users")
-                ]])
-            )
+        sends.append(_send_to_group_members(
+            context, (target_id,), None,
+            text=f"👋 You have been removed from the group '{group_name}'."
+        ))
+        if result != "deleted":
+            sends.append(_send_to_group_members(
+                context, group.members, None,
+                text=f"ℹ️ A member has left the group '{group_name}'."
+            ))
+        if result == "transferred":
+            sends.append(_send_to_group_members(
+                context, (group.creator_id,), None,
+                text=f"👑 You are now the admin of the group '{group_name}'!"
+            ))
+    
+    if group_ids:
+        log_admin_action(update.effective_user.id, "remove_from_group", f"User ID: {target_id}")
+        invalidate_status_cache()
+        text = f"✅ User {target_id} has been removed from their group chat."
+    else:
+        text = f"❌ User {target_id} is not in a group chat."
     
-    elif data.startswith("admin_unban_"):
-        target_id = int(data.split("_")[2])
-        success = await unban_user(user_id, target_id)
-        
-        if success:
-            await query.edit_message_text(
-                text=f"✅ User {target_id} has been unbanned successfully.",
-                reply_markup=InlineKeyboardMarkup([[
-                    InlineKeyboardButton("↩️ Back to User Management", callback_data="admin_users")
-                ]])
-            )
-        else:
-            await query.edit_message_text(
-                text=f"❌ User {target_id} was not banned or does not exist.",
-                reply_markup=InlineKeyboardMarkup([[
-                    InlineKeyboardButton("↩️ Back to User Management", callback_data="admin_users")
-                ]])
-            )
+    await asyncio.gather(*sends)
+    await update.callback_query.edit_message_text(
+        text=text,
+        reply_markup=_BACK_TO_USERS_MARKUP
+    )
+
+async def _do_set_timeout(update: Update, context: ContextTypes.DEFAULT_TYPE, timeout: int) -> None:
+    """Apply one of the preset connection timeouts"""
+    SYSTEM_CONFIG["connection_timeout"] = timeout
+    log_admin_action(update.effective_user.id, "change_config", f"Set timeout to {timeout}s")
+    
+    await update.callback_query.edit_message_text(
+        text=f"✅ Connection timeout set to {timeout} seconds.",
+        reply_markup=_BACK_TO_CONFIG_MARKUP
+    )
+
+async def _do_set_group(update: Update, context: ContextTypes.DEFAULT_TYPE, size: int) -> None:
+    """Apply one of the preset maximum group sizes"""
+    SYSTEM_CONFIG["max_group_size"] = size
+    log_admin_action(update.effective_user.id, "change_config", f"Set max group size to {size}")
+    
+    await update.callback_query.edit_message_text(
+        text=f"✅ Maximum group size set to {size} members.",
+        reply_markup=_BACK_TO_CONFIG_MARKUP
+    )
+
+# Callback data that maps straight to a handler: data -> handler(update, context)
+_EXACT_HANDLERS = {
+    "admin_dashboard": admin_dashboard,
+    "admin_users": admin_user_management,
+    "admin_broadcast": admin_broadcast_message,
+    "admin_config": admin_system_config,
+    "admin_maint_on": _maint_on_handler,
+    "admin_maint_off": _maint_off_handler,
+    "admin_logs": _view_logs_handler,
+}
+
+# Callback data carrying a numeric argument, matched in one pass: action -> handler(update, context, value)
+_CB_RE = re.compile(r"admin_(?P<action>ban|unban|disconnect|remove_waiting|remove_group)_(?P<arg>\d+)")
+_PARAM_HANDLERS = {
+    "ban": _do_ban,
+    "unban": _do_unban,
+    "disconnect": _do_disconnect,
+    "remove_waiting": _do_remove_waiting,
+    "remove_group": _do_remove_group,
+}
+
+# Preset config buttons are matched by the bot's callback router ahead of
+# handle_admin_callback and skip the general dispatch
+ADMIN_CONFIG_CALLBACK_RE = re.compile(r"admin_set_(?P<setting>timeout|group)_(?P<arg>\d+)")
+_CONFIG_SETTERS = {
+    "timeout": _do_set_timeout,
+    "group": _do_set_group,
+}
+
+@require_admin()
+async def handle_admin_config_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, match: re.Match) -> None:
+    """Apply a preset config value straight from its button"""
+    await update.callback_query.answer()
     
-    # Handle system config changes
-    elif data.startswith("admin_set_timeout_"):
-        timeout = int(data.split("_")[3])
-        SYSTEM_CONFIG["connection_timeout"] = timeout
-        log_admin_action(user_id, "change_config", f"Set timeout to {timeout}s")
-        
-        await query.edit_message_text(
-            text=f"✅ Connection timeout set to {timeout} seconds.",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("↩️ Back to System Config", callback_data="admin_config")
-            ]])
-        )
+    await _CONFIG_SETTERS[match['setting']](update, context, int(match['arg']))
+
+# Helper function for admin actions via callback queries
+@require_admin()
+async def handle_admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle admin dashboard callback queries"""
+    query = update.callback_query
+    await query.answer()
     
-    elif data.startswith("admin_set_group_"):
-        size = int(data.split("_")[3])
-        SYSTEM_CONFIG["max_group_size"] = size
-        log_admin_action(user_id, "change_config", f"Set max group size to {size}")
-        
-        await query.edit_message_text(
-            text=f"✅ Maximum group size set to {size} members.",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("↩️ Back to System Config", callback_data="admin_config")
-            ]])
-        )
+    data = query.data
+    
+    # Handle different admin callbacks
+    handler = _EXACT_HANDLERS.get(data)
+    if handler is not None:
+        await handler(update, context)
+        return
+    
+    match = _CB_RE.fullmatch(data)
+    if match:
+        await _PARAM_HANDLERS[match['action']](update, context, int(match['arg']))
+        return
     
     # Handle other admin callbacks...
-    else:
-        await query.edit_message_text(
-            text="⚠️ Unknown admin action.",
-            reply_markup=InlineKeyboardMarkup([[
-                InlineKeyboardButton("↩️ Back to Dashboard", callback_data="admin_dashboard")
-            ]])
-        )
\ No newline at end of file
+    await query.edit_message_text(
+        text="⚠️ Unknown admin action.",
+        reply_markup=_BACK_TO_DASHBOARD_MARKUP
+    )
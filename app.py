@@ -6,8 +6,11 @@ Web frontend for the Anonymous Telegram Chat Bot
 """
 
 import os
+import sqlite3
 from flask import Flask, render_template
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import DeclarativeBase
 
 class Base(DeclarativeBase):
@@ -17,12 +20,34 @@ db = SQLAlchemy(model_class=Base)
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "ANONYM0US_CH4T_B0T")
 
-# Configure SQLite database
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///bot_stats.db"
-app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
+# Configure the database (SQLite unless DATABASE_URL points elsewhere)
+app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///bot_stats.db")
+if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "connect_args": {"check_same_thread": False},
+        "pool_pre_ping": True,
+    }
+else:
+    # Server databases: fail fast on pool exhaustion instead of hanging the worker
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "pool_timeout": 20,
+        "pool_size": 10,
+        "max_overflow": 20,
+    }
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Put every new SQLite connection in WAL mode so readers don't wait on writers"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
 
 # Initialize the app with the extension
 db.init_app(app)
@@ -45,4 +70,7 @@ def help():
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Development server only; the reloader and debugger stay off unless FLASK_DEBUG=1.
+    # In production serve the app with gunicorn, e.g. `gunicorn -w 2 --threads 8 -b 0.0.0.0:5000 app:app`
+    debug = os.environ.get("FLASK_DEBUG") == "1"
+    app.run(host='0.0.0.0', port=5000, debug=debug)
\ No newline at end of file
@@ -5,31 +5,106 @@
 Bot setup and configuration for the Anonymous Telegram Chat Bot
 """
 
+import os
+import sys
+import asyncio
 import logging
+from datetime import time as dt_time
+from functools import partial
 from telegram.ext import (
     Application, CommandHandler, MessageHandler, 
-    filters, CallbackQueryHandler
+    filters, CallbackQueryHandler, AIORateLimiter, BaseUpdateProcessor
 )
+from telegram import Update
+from telegram.request import HTTPXRequest
 from handlers import (
     start, connect, disconnect, handle_message, 
     reveal_identity, handle_callback_query, 
     invite_command, broadcast_command,
     topic_command, group_command, mode_command, leave_command,
-    handle_mood_reaction
+    handle_mood_reaction, stop_group_senders
 )
+from utils import ACTIVE_TODAY, check_waiting_timeouts, prune_reveal_requests, prune_default_preferences
 # Import admin functionality
 from admin import (
     admin_dashboard, admin_user_management, admin_broadcast_message,
     admin_system_config, admin_find_user, handle_admin_callback,
-    ban_user, unban_user
+    handle_admin_config_callback, ADMIN_CONFIG_CALLBACK_RE,
+    ban_user, unban_user, run_admin_log_writer
 )
 
 logger = logging.getLogger(__name__)
 
+# Updates processed at once across all chats
+MAX_CONCURRENT_UPDATES = 256
+
+# Admin audit log writer task, cancelled in post_stop
+_ADMIN_LOG_WRITER = None
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """Process updates from different chats concurrently, but one at a time within a chat"""
+    
+    __slots__ = ("_chat_locks", "_slots")
+    
+    def __init__(self, max_concurrent_updates: int):
+        if max_concurrent_updates < 1:
+            raise ValueError("max_concurrent_updates must be a positive integer")
+        # The base class holds its slot for the whole of do_process_update, including time spent
+        # queued behind earlier updates from the same chat, so one busy chat could take every slot.
+        # Its limit is lifted and _slots is only taken once an update reaches the front of its chat
+        super().__init__(sys.maxsize)
+        self._slots = asyncio.Semaphore(max_concurrent_updates)
+        # chat_id -> [lock, number of updates holding or waiting for it]
+        self._chat_locks = {}
+    
+    async def do_process_update(self, update, coroutine) -> None:
+        chat = update.effective_chat if isinstance(update, Update) else None
+        if chat is None:
+            async with self._slots:
+                await coroutine
+            return
+        
+        entry = self._chat_locks.get(chat.id)
+        if entry is None:
+            entry = self._chat_locks[chat.id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0], self._slots:
+                await coroutine
+        finally:
+            # Drop the lock once nothing from this chat is in flight
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._chat_locks[chat.id]
+    
+    async def initialize(self) -> None:
+        pass
+    
+    async def shutdown(self) -> None:
+        pass
+
 def start_bot(token):
     """Start the bot with the given token"""
     # Create the Application
-    application = Application.builder().token(token).build()
+    # Bot API calls share one large connection pool so concurrent sends reuse open TLS sessions;
+    # long polling gets its own single connection so it never waits behind them
+    application = (
+        Application.builder()
+        .token(token)
+        .request(HTTPXRequest(connection_pool_size=256, read_timeout=20, write_timeout=20, pool_timeout=5))
+        .get_updates_request(HTTPXRequest(connection_pool_size=1, read_timeout=30))
+        # Pace every Bot API call under Telegram's flood limits and retry on RetryAfter
+        .rate_limiter(AIORateLimiter(
+            overall_max_rate=30, overall_time_period=1,
+            group_max_rate=20, group_time_period=60,
+            max_retries=3
+        ))
+        # A slow handler in one chat no longer holds up updates from every other chat
+        .concurrent_updates(PerChatUpdateProcessor(MAX_CONCURRENT_UPDATES))
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .build()
+    )
     
     # Add command handlers
     application.add_handler(CommandHandler("start", start))
@@ -54,31 +129,19 @@ def start_bot(token):
     application.add_handler(CommandHandler("admin_find_user", admin_find_user))
     
     # Add extended broadcast commands for different targeting with proper parameter assignment
-    application.add_handler(CommandHandler("broadcast_all", 
-                                          lambda u, c: admin_broadcast_message(update=u, context=c, target="all")))
-    application.add_handler(CommandHandler("broadcast_active", 
-                                          lambda u, c: admin_broadcast_message(update=u, context=c, target="active")))
-    application.add_handler(CommandHandler("broadcast_waiting", 
-                                          lambda u, c: admin_broadcast_message(update=u, context=c, target="waiting")))
-    application.add_handler(CommandHandler("broadcast_groups", 
-                                          lambda u, c: admin_broadcast_message(update=u, context=c, target="groups")))
+    application.add_handler(CommandHandler("broadcast_all", partial(admin_broadcast_message, target="all")))
+    application.add_handler(CommandHandler("broadcast_active", partial(admin_broadcast_message, target="active")))
+    application.add_handler(CommandHandler("broadcast_waiting", partial(admin_broadcast_message, target="waiting")))
+    application.add_handler(CommandHandler("broadcast_groups", partial(admin_broadcast_message, target="groups")))
     
     # Add configuration commands with proper parameter assignment
-    application.add_handler(CommandHandler("set_timeout", 
-                                          lambda u, c: admin_system_config(update=u, context=c, action="set_timeout")))
-    application.add_handler(CommandHandler("set_group_size", 
-                                          lambda u, c: admin_system_config(update=u, context=c, action="set_group_size")))
-    application.add_handler(CommandHandler("add_banned_word", 
-                                          lambda u, c: admin_system_config(update=u, context=c, action="add_banned_word")))
-    application.add_handler(CommandHandler("remove_banned_word", 
-                                          lambda u, c: admin_system_config(update=u, context=c, action="remove_banned_word")))
-    
-    # Add callback query handler for inline buttons with pattern matching
-    # Admin callbacks start with "admin_" and will be handled by handle_admin_callback
-    application.add_handler(CallbackQueryHandler(handle_admin_callback, pattern="^admin_"))
-    
-    # All other callbacks handled by the regular handler
-    application.add_handler(CallbackQueryHandler(handle_callback_query))
+    application.add_handler(CommandHandler("set_timeout", partial(admin_system_config, action="set_timeout")))
+    application.add_handler(CommandHandler("set_group_size", partial(admin_system_config, action="set_group_size")))
+    application.add_handler(CommandHandler("add_banned_word", partial(admin_system_config, action="add_banned_word")))
+    application.add_handler(CommandHandler("remove_banned_word", partial(admin_system_config, action="remove_banned_word")))
+    
+    # Add a single callback query handler for inline buttons - route_callback picks the target
+    application.add_handler(CallbackQueryHandler(route_callback))
     
     # Add message handler for chat messages
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_message))
@@ -88,11 +151,60 @@ def start_bot(token):
     
     # Set up job queue for timeout checks
     job_queue = application.job_queue
-    job_queue.run_repeating(check_timeouts, interval=5, first=0)
+    job_queue.run_repeating(check_timeouts, interval=1, first=0)
+    
+    # Drop reveal requests nobody answered
+    job_queue.run_repeating(expire_reveal_requests, interval=60, first=60)
     
-    # Start the Bot
-    logger.info("Starting bot...")
-    application.run_polling()
+    # Forget preferences that never moved off the defaults
+    job_queue.run_repeating(trim_user_preferences, interval=3600, first=3600)
+    
+    # Reset the "active today" tracking at midnight
+    job_queue.run_daily(reset_daily_activity, time=dt_time(0, 0))
+    
+    # Start the Bot - behind a webhook in production, long polling otherwise
+    webhook_url = os.environ.get("WEBHOOK_URL")
+    if webhook_url:
+        port = int(os.environ.get("PORT", "8443"))
+        logger.info(f"Starting bot with webhook on port {port}...")
+        application.run_webhook(
+            listen="0.0.0.0",
+            port=port,
+            url_path=token,
+            webhook_url=f"{webhook_url.rstrip('/')}/{token}",
+            secret_token=os.environ.get("TG_SECRET")
+        )
+    else:
+        logger.info("Starting bot...")
+        application.run_polling()
+
+async def post_init(application):
+    """Start background tasks once the application is initialized"""
+    global _ADMIN_LOG_WRITER
+    # Admin audit logging is drained off the handler path. The writer loops forever, so it is a
+    # plain task: Application.stop() waits for application.create_task tasks to finish
+    _ADMIN_LOG_WRITER = asyncio.create_task(run_admin_log_writer())
+
+async def post_stop(application):
+    """Stop background tasks that would otherwise keep running after the application stops"""
+    await stop_group_senders()
+    if _ADMIN_LOG_WRITER is not None:
+        _ADMIN_LOG_WRITER.cancel()
+
+async def route_callback(update, context):
+    """Route inline button presses to the admin or the regular callback handler"""
+    data = update.callback_query.data or ""
+    
+    # Admin callbacks start with "admin_"; preset config buttons skip the general admin dispatch
+    if data.startswith("admin_"):
+        match = ADMIN_CONFIG_CALLBACK_RE.fullmatch(data)
+        if match:
+            await handle_admin_config_callback(update, context, match)
+        else:
+            await handle_admin_callback(update, context)
+    else:
+        # All other callbacks handled by the regular handler
+        await handle_callback_query(update, context)
 
 def error_handler(update, context):
     """Log errors caused by updates"""
@@ -100,5 +212,16 @@ def error_handler(update, context):
 
 async def check_timeouts(context):
     """Check for timeouts in the waiting_since dictionary"""
-    from utils import check_waiting_timeouts
     await check_waiting_timeouts(context)
+
+async def expire_reveal_requests(context):
+    """Remove expired identity reveal requests"""
+    prune_reveal_requests()
+
+async def trim_user_preferences(context):
+    """Remove default user preference entries"""
+    prune_default_preferences()
+
+async def reset_daily_activity(context):
+    """Clear the set of users who were active today"""
+    ACTIVE_TODAY.clear()
@@ -6,11 +6,13 @@ Configuration variables for the Anonymous Telegram Chat Bot
 """
 
 import os
+import time
+from collections import deque
 from datetime import datetime, timedelta
 
 # List of admin user IDs who can broadcast messages and access admin dashboard
 # You can add your Telegram user ID here
-ADMIN_IDS = [int(id) for id in os.environ.get("ADMIN_IDS", "").split(",") if id]
+ADMIN_IDS = frozenset(int(id) for id in os.environ.get("ADMIN_IDS", "").split(",") if id.strip())
 
 # Admin privileges configuration (Adjustable per admin)
 ADMIN_PRIVILEGES = {
@@ -24,28 +26,45 @@ ADMIN_PRIVILEGES = {
 # Bot version and system info for admin dashboard
 BOT_VERSION = "1.1.0"
 BOT_STARTED_AT = datetime.now()
+BOT_STARTED_AT_MONO = time.monotonic()
 
 # Banned users list - user_ids of banned users
-BANNED_USERS = set()
+# BANNED_USERS_MUTABLE is changed by ban/unban; BANNED_USERS is the read-only snapshot
+# checked on every update and is rebound after each change, so import it at call time
+BANNED_USERS_MUTABLE = set()
+BANNED_USERS = frozenset()
 
 # System configurations (changeable by admins)
 SYSTEM_CONFIG = {
     "connection_timeout": 45,    # Seconds to wait for a connection
     "max_group_size": 10,        # Maximum users in a group
     "reveal_timeout": 300,       # Timeout for identity reveal requests (seconds)
-    "banned_words": [],          # List of banned words/phrases
-    "maintenance_mode": False    # If True, only admins can use the bot
+    "banned_words": set(),       # Set of banned words/phrases
+    "maintenance_mode": False,   # If True, only admins can use the bot
+    "status_cache_ttl": 30,      # Seconds to reuse the admin dashboard snapshot
+    "broadcast_concurrency": 25, # Maximum broadcast messages in flight at once
+    "broadcast_progress_interval": 2.0, # Seconds between broadcast progress updates
+    "broadcast_chunk_size": 500, # Targets pulled into memory at a time while broadcasting
+    "broadcast_silent": False,   # Deliver broadcasts without a notification sound
+    "animations_enabled": False  # Stage replies through "typing" edit sequences before the final text
 }
 
-# Statistics tracking for admin dashboard
+# Single compiled pattern matching any banned word, rebuilt whenever the list changes
+# (None while the list is empty) - import it at call time, it is rebound on every change
+BANNED_WORDS_RE = None
+
+# Hot-path counters are plain module ints - bump them as `config.TOTAL_MESSAGES += 1`
+TOTAL_MESSAGES = 0    # Total messages sent through the bot
+CONNECTIONS_MADE = 0  # Total successful connections
+GROUPS_CREATED = 0    # Total group chats created
+
+# Statistics tracking for admin dashboard (refreshed periodically by admin.update_statistics)
 STATISTICS = {
-    "total_messages": 0,          # Total messages sent through the bot
-    "connections_made": 0,        # Total successful connections
     "active_users_today": 0,      # Users active today
     "unique_users": 0,            # Total unique users who used the bot
-    "groups_created": 0,          # Total group chats created
     "last_reset": datetime.now(), # When stats were last reset
 }
 
-# Audit log for admin actions
-ADMIN_LOGS = []
+# Audit log for admin actions - bounded ring buffer, oldest entries are evicted first
+ADMIN_LOG_RING_SIZE = 2000
+ADMIN_LOGS = deque(maxlen=ADMIN_LOG_RING_SIZE)
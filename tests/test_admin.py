@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for admin helpers
+"""
+
+import asyncio
+
+from telegram import User
+
+from admin import get_user_info
+from utils import ALL_USERS, USER_PREFERENCES, USERNAME_INDEX, ChatMode, register_user, set_user_preference
+
+def test_get_user_info_for_known_user():
+    """get_user_info reports the stored profile and chat preferences"""
+    user = User(id=424242, first_name="Ada", is_bot=False, last_name="L", username="ada_l")
+    register_user(user)
+    set_user_preference(user.id, mode=ChatMode.TOPIC, topic="music")
+    
+    try:
+        info = asyncio.run(get_user_info(user.id))
+        
+        assert info["id"] == user.id
+        assert info["username"] == "ada_l"
+        assert info["first_name"] == "Ada"
+        assert info["chat_mode"] == ChatMode.TOPIC.value
+        assert info["topic"] == "music"
+        assert info["is_connected"] is False
+        assert info["in_group"] is False
+        assert info["group_info"] is None
+    finally:
+        ALL_USERS.pop(user.id, None)
+        USER_PREFERENCES.pop(user.id, None)
+        USERNAME_INDEX.pop("ada_l", None)
+
+def test_get_user_info_for_unknown_user():
+    """get_user_info returns an error for users the bot has never seen"""
+    assert asyncio.run(get_user_info(-1)) == {"error": "User not found"}
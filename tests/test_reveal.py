@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for pending identity reveal requests in utils
+"""
+
+import pytest
+
+import config
+import utils
+from utils import REVEAL_REQUESTS, prune_reveal_requests, take_reveal_request
+
+@pytest.fixture(autouse=True)
+def no_reveal_requests():
+    """Start and finish every test with no pending reveal requests"""
+    REVEAL_REQUESTS.clear()
+    yield
+    REVEAL_REQUESTS.clear()
+
+def request_at(partner_id, ts):
+    """A reveal request to partner_id made at monotonic time ts"""
+    return {'partner_id': partner_id, 'ts': ts}
+
+def test_matching_partner_takes_the_request(monkeypatch):
+    """The requester's partner receives the request and it is removed"""
+    monkeypatch.setattr(utils.time, "monotonic", lambda: 1000.0)
+    REVEAL_REQUESTS[1] = request_at(2, 1000.0)
+    
+    assert take_reveal_request(1, 2) == request_at(2, 1000.0)
+    assert 1 not in REVEAL_REQUESTS
+
+def test_mismatched_partner_leaves_the_request(monkeypatch):
+    """An answer from anyone but the requested partner changes nothing"""
+    monkeypatch.setattr(utils.time, "monotonic", lambda: 1000.0)
+    REVEAL_REQUESTS[1] = request_at(2, 1000.0)
+    
+    assert take_reveal_request(1, 3) is None
+    assert take_reveal_request(4, 2) is None
+    assert REVEAL_REQUESTS == {1: request_at(2, 1000.0)}
+
+def test_expired_request_is_dropped(monkeypatch):
+    """A request past reveal_timeout is removed but not returned"""
+    timeout = config.SYSTEM_CONFIG["reveal_timeout"]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: 1000.0 + timeout)
+    REVEAL_REQUESTS[1] = request_at(2, 1000.0)
+    
+    assert take_reveal_request(1, 2) is None
+    assert 1 not in REVEAL_REQUESTS
+
+def test_prune_drops_only_expired_requests(monkeypatch):
+    """Pruning keeps requests still inside reveal_timeout"""
+    timeout = config.SYSTEM_CONFIG["reveal_timeout"]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: 1000.0 + timeout)
+    REVEAL_REQUESTS[1] = request_at(2, 1000.0)
+    REVEAL_REQUESTS[3] = request_at(4, 1001.0)
+    
+    prune_reveal_requests()
+    
+    assert list(REVEAL_REQUESTS) == [3]
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the waiting queues in utils
+"""
+
+import asyncio
+import types
+from collections import deque
+
+import pytest
+
+import utils
+from utils import (
+    _enqueue_waiting, _pop_longest_waiting, add_waiting, pop_waiting, remove_waiting,
+    mark_waiting, check_waiting_timeouts, WARNING_AFTER_SECONDS, TIMEOUT_SECONDS
+)
+
+@pytest.fixture(autouse=True)
+def empty_waiting_queue():
+    """Start and finish every test with an empty one-on-one queue"""
+    for state in (utils.WAITING_USERS, utils.WAITING_TICKETS, utils.WAITING_SINCE, utils.WAITING_DEADLINES):
+        state.clear()
+    yield
+    for state in (utils.WAITING_USERS, utils.WAITING_TICKETS, utils.WAITING_SINCE, utils.WAITING_DEADLINES):
+        state.clear()
+
+def test_users_are_matched_in_arrival_order():
+    """The longest-waiting user is popped first"""
+    for user_id in (1, 2, 3):
+        add_waiting(user_id)
+    
+    assert [pop_waiting(), pop_waiting(), pop_waiting(), pop_waiting()] == [1, 2, 3, None]
+
+def test_cancel_and_requeue_goes_to_the_back():
+    """A user who cancels and searches again waits behind everyone already queued"""
+    for user_id in (1, 2, 3):
+        add_waiting(user_id)
+    
+    assert remove_waiting(1) is True
+    add_waiting(1)
+    
+    assert [pop_waiting(), pop_waiting(), pop_waiting(), pop_waiting()] == [2, 3, 1, None]
+
+def test_adding_a_waiting_user_again_keeps_their_place():
+    """add_waiting for someone already queued doesn't move them"""
+    add_waiting(1)
+    add_waiting(2)
+    add_waiting(1)
+    
+    assert [pop_waiting(), pop_waiting(), pop_waiting()] == [1, 2, None]
+
+def test_removed_user_is_skipped():
+    """A stale entry left behind by remove_waiting is never matched"""
+    for user_id in (1, 2, 3):
+        add_waiting(user_id)
+    
+    assert remove_waiting(2) is True
+    assert remove_waiting(2) is False
+    
+    assert [pop_waiting(), pop_waiting(), pop_waiting()] == [1, 3, None]
+    assert not utils.WAITING_USERS
+
+def test_excluded_user_is_never_matched():
+    """The searching user is skipped and keeps their place at the front"""
+    add_waiting(1)
+    add_waiting(2)
+    
+    assert pop_waiting(exclude=1) == 2
+    assert pop_waiting(exclude=1) is None
+    assert pop_waiting() == 1
+
+def test_excluded_user_alone_stays_queued():
+    """Excluding the only waiting user matches nobody and leaves them waiting"""
+    add_waiting(1)
+    
+    assert pop_waiting(exclude=1) is None
+    assert 1 in utils.WAITING_TICKETS
+    assert pop_waiting() == 1
+
+def test_compaction_keeps_live_users_in_order():
+    """Compaction drops stale entries and keeps the live ones in arrival order"""
+    queue, live = deque(), {}
+    for user_id in range(100):
+        _enqueue_waiting(queue, live, user_id)
+    
+    # Cancel most of the queue, then re-queue a couple of the cancelled users at the back
+    for user_id in range(100):
+        if user_id % 10:
+            del live[user_id]
+    _enqueue_waiting(queue, live, 11)
+    _enqueue_waiting(queue, live, 3)
+    
+    # The enqueue that tipped the stale ratio compacted the deque down to live entries only
+    assert len(queue) == len(live)
+    
+    matched = []
+    while (user_id := _pop_longest_waiting(queue, live)) is not None:
+        matched.append(user_id)
+    assert matched == [0, 10, 20, 30, 40, 50, 60, 70, 80, 90, 11, 3]
+
+class FakeBot:
+    """Records the chats each kind of message was sent to"""
+    
+    def __init__(self):
+        self.actions = []
+        self.messages = []
+    
+    async def send_chat_action(self, chat_id, action):
+        self.actions.append(chat_id)
+    
+    async def send_message(self, chat_id, text, **kwargs):
+        self.messages.append((chat_id, text))
+
+def run_timeouts(monkeypatch, now):
+    """Run check_waiting_timeouts at a given wall-clock time and return the bot it used"""
+    bot = FakeBot()
+    monkeypatch.setattr(utils.time, "time", lambda: now)
+    asyncio.run(check_waiting_timeouts(types.SimpleNamespace(bot=bot)))
+    return bot
+
+def start_search(monkeypatch, user_id, now):
+    """Queue a user for one-on-one chat with their waiting clock started at now"""
+    monkeypatch.setattr(utils.time, "time", lambda: now)
+    add_waiting(user_id)
+    mark_waiting(user_id)
+
+def test_deadlines_warn_then_time_out(monkeypatch):
+    """A waiting user is warned first, then timed out and taken out of the queue"""
+    start_search(monkeypatch, 1, 1000.0)
+    
+    bot = run_timeouts(monkeypatch, 1000.0 + WARNING_AFTER_SECONDS - 1)
+    assert bot.messages == []
+    
+    bot = run_timeouts(monkeypatch, 1000.0 + WARNING_AFTER_SECONDS)
+    assert bot.actions == [1]
+    assert [chat_id for chat_id, _ in bot.messages] == [1]
+    assert 1 in utils.WAITING_TICKETS
+    
+    bot = run_timeouts(monkeypatch, 1000.0 + TIMEOUT_SECONDS)
+    assert [chat_id for chat_id, _ in bot.messages] == [1]
+    assert "Search timeout" in bot.messages[0][1]
+    assert 1 not in utils.WAITING_TICKETS
+    assert 1 not in utils.WAITING_SINCE
+    assert not utils.WAITING_DEADLINES
+
+def test_matched_user_gets_no_deadline_notices(monkeypatch):
+    """Deadlines for a user who stopped waiting are dropped silently"""
+    start_search(monkeypatch, 1, 1000.0)
+    assert pop_waiting() == 1
+    utils.WAITING_SINCE.pop(1)
+    
+    bot = run_timeouts(monkeypatch, 1000.0 + TIMEOUT_SECONDS)
+    assert bot.messages == []
+    assert not utils.WAITING_DEADLINES
+
+def test_new_search_replaces_old_deadlines(monkeypatch):
+    """Deadlines from an earlier search don't fire against a later one"""
+    start_search(monkeypatch, 1, 1000.0)
+    remove_waiting(1)
+    start_search(monkeypatch, 1, 1020.0)
+    
+    # The first search's timeout is due, the second search's is not
+    bot = run_timeouts(monkeypatch, 1000.0 + TIMEOUT_SECONDS)
+    assert "Search timeout" not in "".join(text for _, text in bot.messages)
+    assert 1 in utils.WAITING_TICKETS
@@ -5,21 +5,23 @@
 Utility functions and data structures for the Anonymous Telegram Chat Bot
 """
 
-import asyncio
-import logging
-from typing import Callable, Any, Optional
-
+import heapq
+import itertools
 import random
 import time
+from collections import deque
 import logging
 import asyncio
 from enum import Enum
-from dataclasses import dataclass
-from typing import Dict, List, Optional, Set, Union
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Set
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, User, Update
 from telegram.ext import ContextTypes
+from telegram.constants import ParseMode
 from functools import wraps
 
+import config
+
 logger = logging.getLogger(__name__)
 
 # Define chat modes
@@ -42,117 +44,256 @@ class GroupChat:
     members: Set[int]
     name: str
     max_size: int = 10
+    # Stable anonymous member numbers: user_id -> number and number -> user_id
+    member_numbers: Dict[int, int] = field(default_factory=dict)
+    number_members: Dict[int, int] = field(default_factory=dict)
+    next_number: int = 1
+    # Kept in step with members by add_member/remove_member
+    full: bool = field(init=False, default=False)
+    
+    def __post_init__(self):
+        for user_id in self.members:
+            self._assign_number(user_id)
+        self.full = len(self.members) >= self.max_size
+    
+    def _assign_number(self, user_id: int) -> None:
+        if user_id not in self.member_numbers:
+            self.member_numbers[user_id] = self.next_number
+            self.number_members[self.next_number] = user_id
+            self.next_number += 1
     
-    def is_full(self) -> bool:
-        return len(self.members) >= self.max_size
+    def add_member(self, user_id: int) -> None:
+        """Add a member and give them the next anonymous number"""
+        self.members.add(user_id)
+        self._assign_number(user_id)
+        self.full = len(self.members) >= self.max_size
+        bump_group_state()
+    
+    def remove_member(self, user_id: int) -> None:
+        """Remove a member; their number is retired rather than reused"""
+        self.members.discard(user_id)
+        number = self.member_numbers.pop(user_id, None)
+        if number is not None:
+            del self.number_members[number]
+        self.full = len(self.members) >= self.max_size
+        bump_group_state()
+
+@dataclass(slots=True)
+class UserPref:
+    mode: ChatMode = ChatMode.ONE_ON_ONE
+    topic: Optional[str] = None
+    group_id: Optional[str] = None
 
 # Main data structures
-# Store waiting users for 1:1 chats: [user_id]
-WAITING_USERS = []
+# Store waiting users for 1:1 chats in arrival order: deque([(ticket, user_id)])
+# WAITING_TICKETS is the source of truth: user_id -> ticket of their live queue entry.
+# Entries whose ticket is no longer current (cancelled, matched or re-queued) are skipped lazily when popped
+WAITING_USERS = deque()
+WAITING_TICKETS = {}
+
+# Store users waiting by topic in arrival order: topic -> deque([(ticket, user_id)])
+# WAITING_BY_TOPIC_TICKETS holds who is really waiting per topic; other entries are skipped lazily
+WAITING_BY_TOPIC = {topic: deque() for topic in AVAILABLE_TOPICS}
+WAITING_BY_TOPIC_TICKETS = {topic: {} for topic in AVAILABLE_TOPICS}
 
-# Store users waiting by topic: topic -> [user_id]
-WAITING_BY_TOPIC = {topic: [] for topic in AVAILABLE_TOPICS}
+# Source of queue tickets, increasing with every enqueue
+_WAITING_TICKET = itertools.count()
+
+# Reverse map of WAITING_BY_TOPIC: user_id -> topic
+# Its keys are every topic waiter, so readers never walk all topics
+WAITING_TOPIC_OF = {}
 
 # Store active 1:1 connections: user_id -> partner_id
 ACTIVE_CONNECTIONS = {}
 
+# Store each active 1:1 connection once: (smaller user_id, larger user_id)
+ACTIVE_PAIRS = set()
+
 # Store when a user started waiting: user_id -> timestamp
 WAITING_SINCE = {}
 
-# Store user modes and preferences: user_id -> {'mode': ChatMode, 'topic': str, 'group_id': str}
+# Store user modes and preferences: user_id -> UserPref
 USER_PREFERENCES = {}
 
 # Store active group chats: group_id -> GroupChat object
 GROUP_CHATS = {}
 
+# Reverse index of group membership: user_id -> {group_id}
+USER_GROUPS = {}
+
+# Bumped whenever a group is created, deleted or changes membership, so views of GROUP_CHATS can be cached
+GROUP_STATE_VERSION = 0
+
+# Cached group browse keyboard: (GROUP_STATE_VERSION it was built at, markup or None)
+_GROUP_BROWSE_CACHE = None
+
 # Store all users who have used the bot: user_id -> User
 ALL_USERS = {}
 
-# Store identity reveal requests: requester_id -> {'partner_id': id, 'status': 'pending/accepted/rejected'}
+# Index for admin username search: lowercase username -> user_id
+USERNAME_INDEX = {}
+
+# Store users who sent a message today: {user_id} (cleared daily by the job queue)
+ACTIVE_TODAY = set()
+
+# Store identity reveal requests: requester_id -> {'partner_id': id, 'status': 'pending/accepted/rejected', 'ts': monotonic time}
 REVEAL_REQUESTS = {}
 
 # Timeout in seconds
 TIMEOUT_SECONDS = 45
 
+# Seconds of waiting before the "still searching" warning
+WARNING_AFTER_SECONDS = 30
+
+# Min-heap of pending waiting deadlines: (due_at, user_id, waiting_since, "warn"/"timeout")
+# Entries whose waiting_since no longer matches WAITING_SINCE are stale and skipped when popped
+WAITING_DEADLINES = []
+
 def get_user_data(user_id):
     """Get user data from the ALL_USERS dictionary"""
     return ALL_USERS.get(user_id)
 
+def register_user(user):
+    """Record a user in ALL_USERS and keep the username index up to date"""
+    previous = ALL_USERS.get(user.id)
+    # Skip the write when nothing shown to other users has changed
+    if previous is not None and (
+        previous.username == user.username
+        and previous.first_name == user.first_name
+        and previous.last_name == user.last_name
+    ):
+        return
+    
+    if previous is not None and previous.username and previous.username != user.username:
+        if USERNAME_INDEX.get(previous.username.lower()) == user.id:
+            del USERNAME_INDEX[previous.username.lower()]
+    
+    ALL_USERS[user.id] = user
+    if user.username:
+        USERNAME_INDEX[user.username.lower()] = user.id
+
 def get_user_preference(user_id):
     """Get user's chat preferences or set default if not exists"""
-    if user_id not in USER_PREFERENCES:
-        USER_PREFERENCES[user_id] = {
-            'mode': ChatMode.ONE_ON_ONE,
-            'topic': None,
-            'group_id': None
-        }
-    return USER_PREFERENCES[user_id]
+    prefs = USER_PREFERENCES.get(user_id)
+    if prefs is None:
+        prefs = USER_PREFERENCES[user_id] = UserPref()
+    return prefs
 
 def set_user_preference(user_id, mode=None, topic=None, group_id=None):
     """Set user's chat preferences"""
     prefs = get_user_preference(user_id)
     if mode:
-        prefs['mode'] = mode
+        prefs.mode = mode
     if topic is not None:  # Could be empty string
-        prefs['topic'] = topic
+        prefs.topic = topic
     if group_id is not None:  # Could be empty string
-        prefs['group_id'] = group_id
-    USER_PREFERENCES[user_id] = prefs
+        prefs.group_id = group_id
     return prefs
 
+def reset_group_preference(user_id):
+    """Put a user back in 1:1 mode and forget their group"""
+    prefs = get_user_preference(user_id)
+    prefs.mode = ChatMode.ONE_ON_ONE
+    prefs.group_id = None
+
+def prune_default_preferences():
+    """Drop preference entries still at their defaults; get_user_preference recreates them on demand"""
+    default = UserPref()
+    stale = [uid for uid, prefs in USER_PREFERENCES.items() if prefs == default]
+    for uid in stale:
+        del USER_PREFERENCES[uid]
+
+def mark_waiting(user_id):
+    """Start a user's waiting clock and schedule their warning and timeout"""
+    start_time = time.time()
+    WAITING_SINCE[user_id] = start_time
+    heapq.heappush(WAITING_DEADLINES, (start_time + WARNING_AFTER_SECONDS, user_id, start_time, "warn"))
+    heapq.heappush(WAITING_DEADLINES, (start_time + TIMEOUT_SECONDS, user_id, start_time, "timeout"))
+
+def _enqueue_waiting(queue, live, user_id):
+    """Append a user to a waiting queue and compact it once stale entries dominate"""
+    ticket = next(_WAITING_TICKET)
+    live[user_id] = ticket
+    queue.append((ticket, user_id))
+    
+    if len(queue) > 2 * len(live) + 32:
+        kept = [entry for entry in queue if live.get(entry[1]) == entry[0]]
+        queue.clear()
+        queue.extend(kept)
+
+def _pop_longest_waiting(queue, live, exclude=None):
+    """Pop the longest-waiting live user from a waiting queue, skipping stale entries"""
+    partner_id = None
+    skipped = None
+    while queue:
+        entry = queue.popleft()
+        ticket, candidate = entry
+        # A stale ticket means the user left the queue, or re-joined it further back
+        if live.get(candidate) != ticket:
+            continue
+        if candidate == exclude:
+            # Never match a user with themselves - they go back to the front below
+            skipped = entry
+            continue
+        del live[candidate]
+        partner_id = candidate
+        break
+    
+    if skipped is not None:
+        queue.appendleft(skipped)
+    return partner_id
+
+def add_waiting(user_id):
+    """Add a user to the back of the one-on-one waiting queue"""
+    if user_id not in WAITING_TICKETS:
+        _enqueue_waiting(WAITING_USERS, WAITING_TICKETS, user_id)
+
+def remove_waiting(user_id):
+    """Remove a user from the one-on-one waiting queue, returning whether they were in it"""
+    return WAITING_TICKETS.pop(user_id, None) is not None
+
+def pop_waiting(exclude=None):
+    """Pop the longest-waiting user from the one-on-one queue"""
+    return _pop_longest_waiting(WAITING_USERS, WAITING_TICKETS, exclude)
+
+def add_topic_waiting(user_id, topic):
+    """Add a user to a topic waiting list (a user waits on one topic at a time)"""
+    if user_id in WAITING_TOPIC_OF:
+        remove_topic_waiting(user_id)
+    _enqueue_waiting(WAITING_BY_TOPIC[topic], WAITING_BY_TOPIC_TICKETS[topic], user_id)
+    WAITING_TOPIC_OF[user_id] = topic
+
+def remove_topic_waiting(user_id):
+    """Remove a user from the topic waiting lists and return the topic they were waiting on"""
+    topic = WAITING_TOPIC_OF.pop(user_id, None)
+    if topic is None:
+        return None
+    
+    WAITING_BY_TOPIC_TICKETS[topic].pop(user_id, None)
+    return topic
+
+def pop_topic_waiting(topic, exclude=None):
+    """Pop the longest-waiting user from a topic waiting list"""
+    partner_id = _pop_longest_waiting(WAITING_BY_TOPIC[topic], WAITING_BY_TOPIC_TICKETS[topic], exclude)
+    if partner_id is not None:
+        WAITING_TOPIC_OF.pop(partner_id, None)
+    return partner_id
+
 def find_partner(user_id, mode=None, topic=None):
-    """Find a random chat partner based on mode and topic"""
+    """Find the longest-waiting chat partner based on mode and topic"""
     # Get user's chat mode if not provided
     if mode is None:
         user_prefs = get_user_preference(user_id)
-        mode = user_prefs['mode']
-        topic = user_prefs['topic']
+        mode = user_prefs.mode
+        topic = user_prefs.topic
     
-    # For one-on-one mode
+    # For one-on-one mode - longest-waiting user first
     if mode == ChatMode.ONE_ON_ONE:
-        # Copy the waiting list to avoid modification during iteration
-        potential_partners = WAITING_USERS.copy()
-        
-        # Remove the user if they're in the waiting list
-        if user_id in potential_partners:
-            potential_partners.remove(user_id)
-        
-        # If no potential partners, return None
-        if not potential_partners:
-            return None
-        
-        # Select a random partner
-        partner_id = random.choice(potential_partners)
-        
-        # Ensure user isn't connecting to themselves
-        if partner_id == user_id:
-            logger.warning(f"Attempted self-connection for user {user_id}")
-            return None
-        
-        return partner_id
+        return pop_waiting(exclude=user_id)
     
-    # For topic-based mode
+    # For topic-based mode - longest-waiting user with the same topic first
     elif mode == ChatMode.TOPIC and topic in AVAILABLE_TOPICS:
-        # Copy the topic waiting list
-        potential_partners = WAITING_BY_TOPIC[topic].copy()
-        
-        # Remove the user if they're in the waiting list
-        if user_id in potential_partners:
-            potential_partners.remove(user_id)
-        
-        # If no potential partners, return None
-        if not potential_partners:
-            return None
-        
-        # Select a random partner with the same topic interest
-        partner_id = random.choice(potential_partners)
-        
-        # Safety check
-        if partner_id == user_id:
-            logger.warning(f"Attempted self-connection for user {user_id} in topic {topic}")
-            return None
-        
-        return partner_id
+        return pop_topic_waiting(topic, exclude=user_id)
     
     return None
 
@@ -160,6 +301,25 @@ def generate_group_id():
     """Generate a unique ID for a group chat"""
     return f"grp_{int(time.time())}_{random.randint(1000, 9999)}"
 
+def bump_group_state():
+    """Mark GROUP_CHATS as changed so cached views of it are rebuilt"""
+    global GROUP_STATE_VERSION
+    GROUP_STATE_VERSION += 1
+
+def group_browse_markup():
+    """Join buttons for every group with room left, rebuilt only after groups change; None when none has room"""
+    global _GROUP_BROWSE_CACHE
+    if _GROUP_BROWSE_CACHE is None or _GROUP_BROWSE_CACHE[0] != GROUP_STATE_VERSION:
+        rows = [
+            [InlineKeyboardButton(
+                f"{group.name} ({len(group.members)}/{group.max_size})",
+                callback_data=f"join_group_{group_id}"
+            )]
+            for group_id, group in GROUP_CHATS.items() if not group.full
+        ]
+        _GROUP_BROWSE_CACHE = (GROUP_STATE_VERSION, InlineKeyboardMarkup(rows) if rows else None)
+    return _GROUP_BROWSE_CACHE[1]
+
 def create_group_chat(creator_id, name, max_size=10):
     """Create a new group chat"""
     group_id = generate_group_id()
@@ -175,6 +335,9 @@ def create_group_chat(creator_id, name, max_size=10):
     
     # Add to active groups
     GROUP_CHATS[group_id] = group
+    bump_group_state()
+    USER_GROUPS.setdefault(creator_id, set()).add(group_id)
+    config.GROUPS_CREATED += 1
     
     # Update creator's preferences
     set_user_preference(creator_id, mode=ChatMode.GROUP, group_id=group_id)
@@ -183,9 +346,10 @@ def create_group_chat(creator_id, name, max_size=10):
 
 def add_to_group(user_id, group_id):
     """Add a user to a group chat"""
-    if group_id in GROUP_CHATS and not GROUP_CHATS[group_id].is_full():
+    if group_id in GROUP_CHATS and not GROUP_CHATS[group_id].full:
         # Add user to group members
-        GROUP_CHATS[group_id].members.add(user_id)
+        GROUP_CHATS[group_id].add_member(user_id)
+        USER_GROUPS.setdefault(user_id, set()).add(group_id)
         
         # Update user preferences
         set_user_preference(user_id, mode=ChatMode.GROUP, group_id=group_id)
@@ -193,198 +357,211 @@ def add_to_group(user_id, group_id):
         return True
     return False
 
+def discard_user_group(user_id, group_id):
+    """Drop a group from a user's entry in the USER_GROUPS index"""
+    group_ids = USER_GROUPS.get(user_id)
+    if group_ids is not None:
+        group_ids.discard(group_id)
+        if not group_ids:
+            del USER_GROUPS[user_id]
+
 def leave_group(user_id, group_id):
     """Remove a user from a group chat"""
-    if group_id in GROUP_CHATS and user_id in GROUP_CHATS[group_id].members:
-        # Remove from group
-        GROUP_CHATS[group_id].members.remove(user_id)
-        
-        # Reset user preferences
-        set_user_preference(user_id, mode=ChatMode.ONE_ON_ONE, group_id=None)
-        
-        # If group is empty, delete it
-        if len(GROUP_CHATS[group_id].members) == 0:
-            del GROUP_CHATS[group_id]
-            return "deleted"
-        
-        # If creator left, assign new creator
-        if user_id == GROUP_CHATS[group_id].creator_id and GROUP_CHATS[group_id].members:
-            GROUP_CHATS[group_id].creator_id = next(iter(GROUP_CHATS[group_id].members))
-            return "transferred"
-        
-        return "left"
-    return False
+    group = GROUP_CHATS.get(group_id)
+    if group is None or user_id not in group.members:
+        return False
+    
+    # Remove from group
+    group.remove_member(user_id)
+    discard_user_group(user_id, group_id)
+    
+    # Reset user preferences
+    reset_group_preference(user_id)
+    
+    # If group is empty, delete it
+    if not group.members:
+        GROUP_CHATS.pop(group_id, None)
+        bump_group_state()
+        return "deleted"
+    
+    # If creator left, assign new creator
+    if user_id == group.creator_id:
+        group.creator_id = next(iter(group.members))
+        return "transferred"
+    
+    return "left"
+
+def pair_users(user_id, partner_id):
+    """Record an active 1:1 connection in both directions"""
+    ACTIVE_CONNECTIONS[user_id] = partner_id
+    ACTIVE_CONNECTIONS[partner_id] = user_id
+    ACTIVE_PAIRS.add((min(user_id, partner_id), max(user_id, partner_id)))
+
+def unpair_user(user_id):
+    """Remove a user's active 1:1 connection in both directions and return the former partner"""
+    partner_id = ACTIVE_CONNECTIONS.pop(user_id, None)
+    if partner_id is not None:
+        ACTIVE_CONNECTIONS.pop(partner_id, None)
+        ACTIVE_PAIRS.discard((min(user_id, partner_id), max(user_id, partner_id)))
+    return partner_id
 
 def disconnect_users(user_id, partner_id):
     """Disconnect two users from a chat"""
     # Remove from active connections
-    if user_id in ACTIVE_CONNECTIONS:
-        del ACTIVE_CONNECTIONS[user_id]
-    if partner_id in ACTIVE_CONNECTIONS:
-        del ACTIVE_CONNECTIONS[partner_id]
+    unpair_user(user_id)
     
     # Clean up any pending reveal requests
-    if user_id in REVEAL_REQUESTS:
-        del REVEAL_REQUESTS[user_id]
-    if partner_id in REVEAL_REQUESTS:
-        del REVEAL_REQUESTS[partner_id]
+    REVEAL_REQUESTS.pop(user_id, None)
+    REVEAL_REQUESTS.pop(partner_id, None)
         
     # Reset user preferences to default
     set_user_preference(user_id, mode=ChatMode.ONE_ON_ONE, topic=None, group_id=None)
     set_user_preference(partner_id, mode=ChatMode.ONE_ON_ONE, topic=None, group_id=None)
 
+def reveal_request_expired(request):
+    """True once a reveal request has gone unanswered past the configured reveal_timeout"""
+    return time.monotonic() - request['ts'] >= config.SYSTEM_CONFIG["reveal_timeout"]
+
+def take_reveal_request(requester_id, partner_id):
+    """Remove and return requester_id's live reveal request to partner_id, or None"""
+    request = REVEAL_REQUESTS.get(requester_id)
+    # A stale or mismatched answer leaves the pending request alone
+    if request is None or request['partner_id'] != partner_id:
+        return None
+    del REVEAL_REQUESTS[requester_id]
+    if reveal_request_expired(request):
+        return None
+    return request
+
+def prune_reveal_requests():
+    """Drop reveal requests that have gone unanswered past the configured reveal_timeout"""
+    expired = [uid for uid, request in REVEAL_REQUESTS.items() if reveal_request_expired(request)]
+    for uid in expired:
+        del REVEAL_REQUESTS[uid]
+
 async def check_waiting_timeouts(context):
     """Check for users who have been waiting too long in any waiting list"""
     current_time = time.time()
+    warned_users = []
     timed_out_users = []
     
-    # Find users who have timed out and users approaching timeout
-    for user_id, start_time in list(WAITING_SINCE.items()):
-        # First warning at 30 seconds
-        if 30 < current_time - start_time < 35:
-            try:
-                # Send a gentle warning with animated typing indicator
-                await context.bot.send_chat_action(chat_id=user_id, action="typing")
-                await context.bot.send_message(
-                    chat_id=user_id,
-                    text="⏳ *Still searching for your match*...\n\nIt's taking a bit longer than usual. We'll keep looking!",
-                    parse_mode='Markdown'
-                )
-            except Exception as e:
-                logger.error(f"Error sending timeout warning to user {user_id}: {e}")
+    # Pop only the deadlines that are due - users still inside their window are never touched
+    while WAITING_DEADLINES and WAITING_DEADLINES[0][0] <= current_time:
+        _, user_id, start_time, kind = heapq.heappop(WAITING_DEADLINES)
+        
+        # Skip users who matched, cancelled or started a new search since this was scheduled
+        if WAITING_SINCE.get(user_id) != start_time:
+            continue
         
-        # Full timeout at 45 seconds
-        elif current_time - start_time > TIMEOUT_SECONDS:
-            timed_out_users.append(user_id)
+        # First warning at 30 seconds, full timeout at 45 seconds
+        if kind == "warn":
+            warned_users.append(user_id)
+        else:
+            timed_out_users.append((user_id, start_time))
     
-    # Process timed out users with animation
-    for user_id in timed_out_users:
+    # Take timed out users out of the queues before anything is awaited, so a /connect
+    # handled while the notices go out can't match a user who is about to be told they timed out
+    notices = [_send_search_warning(context, user_id) for user_id in warned_users]
+    for user_id, start_time in timed_out_users:
+        if WAITING_SINCE.get(user_id) != start_time:
+            continue
         user_prefs = get_user_preference(user_id)
         
         # Remove from appropriate waiting structures
-        if user_id in WAITING_USERS:
-            WAITING_USERS.remove(user_id)
+        remove_waiting(user_id)
             
         # Check if user was waiting for topic-based chat
-        if user_prefs['mode'] == ChatMode.TOPIC and user_prefs['topic'] in AVAILABLE_TOPICS:
-            topic = user_prefs['topic']
-            if user_id in WAITING_BY_TOPIC[topic]:
-                WAITING_BY_TOPIC[topic].remove(user_id)
+        remove_topic_waiting(user_id)
         
         # Remove from the timestamp tracking
-        if user_id in WAITING_SINCE:
-            del WAITING_SINCE[user_id]
+        WAITING_SINCE.pop(user_id, None)
         
-        try:
-            # Send animated timeout message
-            timeout_message = await context.bot.send_message(
-                chat_id=user_id,
-                text="⏱️ *Search timeout in progress*...",
-                parse_mode='Markdown'
-            )
-            
-            # Animation sequence - customize based on mode
-            if user_prefs['mode'] == ChatMode.ONE_ON_ONE:
-                timeout_steps = [
-                    "⏱️ *Search timeout*\n\nAnalyzing one-on-one connection attempts...",
-                    "⏱️ *Search timeout*\n\nWe've searched everywhere, but couldn't find a one-on-one match right now.",
-                    "⏱️ *Search timeout*\n\nNo users are available for one-on-one chat at the moment."
-                ]
-            elif user_prefs['mode'] == ChatMode.TOPIC:
-                topic_name = user_prefs['topic'] or "Unknown"
-                timeout_steps = [
-                    f"⏱️ *Search timeout*\n\nAnalyzing '{topic_name}' topic connections...",
-                    f"⏱️ *Search timeout*\n\nWe've searched, but couldn't find anyone interested in '{topic_name}' right now.",
-                    f"⏱️ *Search timeout*\n\nNo users available for '{topic_name}' topic chat at the moment."
-                ]
-            else:
-                timeout_steps = [
-                    "⏱️ *Search timeout*\n\nAnalyzing connection attempts...",
-                    "⏱️ *Search timeout*\n\nWe've looked everywhere, but couldn't find a match right now.",
-                    "⏱️ *Search timeout*\n\nNo available users match your criteria at the moment."
-                ]
-            
-            # Play animation
-            for step in timeout_steps:
-                await asyncio.sleep(0.8)
-                try:
-                    await context.bot.edit_message_text(
-                        chat_id=user_id,
-                        message_id=timeout_message.message_id,
-                        text=step,
-                        parse_mode='Markdown'
-                    )
-                except Exception as e:
-                    logger.error(f"Error updating timeout animation for user {user_id}: {e}")
-            
-            # Add some helpful suggestions
-            suggestions = [
-                "💡 **Suggestions:**",
-                "• Try at a different time when more users might be online",
-                "• Consider changing to a different chat mode",
-                "• If using topic-based chat, try a more popular topic"
-            ]
-            
-            suggestion_text = timeout_steps[-1] + "\n\n" + "\n".join(suggestions)
-            
-            try:
-                await context.bot.edit_message_text(
-                    chat_id=user_id,
-                    message_id=timeout_message.message_id,
-                    text=suggestion_text,
-                    parse_mode='Markdown'
-                )
-            except Exception as e:
-                logger.error(f"Error updating suggestions for user {user_id}: {e}")
-            
-            # Create retry buttons with visual enhancements
-            keyboard = [
-                [InlineKeyboardButton("🔄 Try Again", callback_data="try_again")],
-                [InlineKeyboardButton("🔀 Change Chat Mode", callback_data="change_mode")]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
-            
-            # Send options as a separate message for better visibility
-            await context.bot.send_message(
-                chat_id=user_id,
-                text="✨ *What would you like to do next?*",
-                reply_markup=reply_markup,
-                parse_mode='Markdown'
-            )
-            
-        except Exception as e:
-            logger.error(f"Error sending timeout message to {user_id}: {e}")
+        notices.append(_send_timeout_notice(context, user_id, _timeout_text(user_prefs)))
+    
+    # Send the warnings and timeout notices concurrently
+    await asyncio.gather(*notices)
+
+async def _send_search_warning(context, user_id):
+    """Tell a user the search is taking longer than usual, with a typing indicator first"""
+    try:
+        await context.bot.send_chat_action(chat_id=user_id, action="typing")
+        await context.bot.send_message(
+            chat_id=user_id,
+            text="⏳ *Still searching for your match*...\n\nIt's taking a bit longer than usual. We'll keep looking!",
+            parse_mode=ParseMode.MARKDOWN
+        )
+    except Exception as e:
+        logger.error(f"Error sending timeout warning to user {user_id}: {e}")
+
+# Suggestions and retry buttons appended to every search timeout notice
+_TIMEOUT_SUGGESTIONS = (
+    "💡 *Suggestions:*\n"
+    "• Try at a different time when more users might be online\n"
+    "• Consider changing to a different chat mode\n"
+    "• If using topic-based chat, try a more popular topic"
+)
+
+_TIMEOUT_MARKUP = InlineKeyboardMarkup([
+    [InlineKeyboardButton("🔄 Try Again", callback_data="try_again")],
+    [InlineKeyboardButton("🔀 Change Chat Mode", callback_data="change_mode")]
+])
+
+def _timeout_text(user_prefs):
+    """Search timeout notice for the user's chat mode"""
+    if user_prefs.mode == ChatMode.ONE_ON_ONE:
+        reason = "No users are available for one-on-one chat at the moment."
+    elif user_prefs.mode == ChatMode.TOPIC:
+        reason = f"No users available for '{user_prefs.topic or 'Unknown'}' topic chat at the moment."
+    else:
+        reason = "No available users match your criteria at the moment."
+    return f"⏱️ *Search timeout*\n\n{reason}\n\n{_TIMEOUT_SUGGESTIONS}"
+
+async def _send_timeout_notice(context, user_id, text):
+    """Send the search timeout notice with its retry buttons, logging failures"""
+    try:
+        await context.bot.send_message(
+            chat_id=user_id,
+            text=text,
+            reply_markup=_TIMEOUT_MARKUP,
+            parse_mode=ParseMode.MARKDOWN
+        )
+    except Exception as e:
+        logger.error(f"Error sending timeout message to {user_id}: {e}")
+
+# Notices sent when a banned user or, during maintenance, a non-admin tries to use the bot
+BANNED_TEXT = "⛔ *You have been banned from using this bot.*\n\nIf you think this is a mistake, please contact the administrator."
+MAINTENANCE_TEXT = "🛠️ *Bot Maintenance Mode*\n\nThe bot is currently under maintenance and temporarily unavailable.\n\nPlease try again later."
+
+async def reject_blocked_user(update: Update, context: ContextTypes.DEFAULT_TYPE) -> bool:
+    """Register the user and send the ban or maintenance notice; True when the caller should stop"""
+    user_id = update.effective_user.id
+    
+    # Always add users to the ALL_USERS dictionary for broadcasts
+    register_user(update.effective_user)
+    
+    # Banned users are told so; during maintenance only admins get through.
+    # admin imports utils, so admins are checked against config.ADMIN_IDS
+    # directly rather than through admin.is_admin
+    if user_id in config.BANNED_USERS and user_id not in config.ADMIN_IDS:
+        text = BANNED_TEXT
+    elif config.SYSTEM_CONFIG["maintenance_mode"] and user_id not in config.ADMIN_IDS:
+        text = MAINTENANCE_TEXT
+    else:
+        return False
+    
+    await context.bot.send_message(
+        chat_id=update.effective_chat.id,
+        text=text,
+        parse_mode=ParseMode.MARKDOWN
+    )
+    return True
 
 # Admin permission decorator
 def check_user_access(func):
     """Decorator to check if user is banned or if maintenance mode is on"""
     @wraps(func)
     async def wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
-        from config import SYSTEM_CONFIG, BANNED_USERS
-        from admin import is_admin
-        
-        user_id = update.effective_user.id
-        chat_id = update.effective_chat.id
-        
-        # Always add users to the ALL_USERS dictionary for broadcasts
-        ALL_USERS[user_id] = update.effective_user
-        
-        # Check if user is banned
-        if user_id in BANNED_USERS and not is_admin(user_id):
-            await context.bot.send_message(
-                chat_id=chat_id,
-                text="⛔ *You have been banned from using this bot.*\n\nIf you think this is a mistake, please contact the administrator.",
-                parse_mode='Markdown'
-            )
-            return
-        
-        # Check for maintenance mode - only admins can use the bot when in maintenance
-        if SYSTEM_CONFIG["maintenance_mode"] and not is_admin(user_id):
-            await context.bot.send_message(
-                chat_id=chat_id,
-                text="🛠️ *Bot Maintenance Mode*\n\nThe bot is currently under maintenance and temporarily unavailable.\n\nPlease try again later.",
-                parse_mode='Markdown'
-            )
+        if await reject_blocked_user(update, context):
             return
         
         # If user has access, proceed with the command